@@ -3,10 +3,11 @@ Gendei Agent Definitions - Clinic Scheduling Agents
 Provider-agnostic agent definitions for healthcare/clinic use case.
 """
 
+import os
 from typing import List
 
 from src.providers.base import AgentDefinition, AgentType, ModelConfig
-from .prompts import AGENT_PROMPTS
+from .prompts import get_prompt_template
 
 
 # Model configurations
@@ -26,6 +27,16 @@ COMPLEX_MODEL = ModelConfig(
     tool_choice="auto",
 )
 
+# Greetings are short, single-turn replies: the smallest tier is enough.
+# Override with OPENAI_GREETER_MODEL if the tone regresses.
+GREETER_MODEL = ModelConfig(
+    tier="fast",
+    openai_model=os.getenv("OPENAI_GREETER_MODEL", "gpt-4.1-nano"),
+    max_tokens=200,
+    temperature=0.7,
+    tool_choice="auto",
+)
+
 ROUTER_MODEL = ModelConfig(
     tier="fast",
     openai_model="gpt-4.1-mini",
@@ -42,8 +53,9 @@ AGENT_DEFINITIONS: List[AgentDefinition] = [
         agent_type=AgentType.GREETER,
         name="greeter_agent",
         description="First-contact agent: welcomes patients and identifies their intent",
-        system_prompt=AGENT_PROMPTS["greeter"],
-        model_config=FAST_MODEL,
+        system_prompt=get_prompt_template("greeter"),
+        prompt_key="greeter",
+        model_config=GREETER_MODEL,
         tools=[
             "send_text_message",
         ],
@@ -55,7 +67,8 @@ AGENT_DEFINITIONS: List[AgentDefinition] = [
         agent_type=AgentType.PRODUCT_INFO,  # Reusing type for clinic info
         name="clinic_info_agent",
         description="Answers questions about clinic location, hours, services, professionals",
-        system_prompt=AGENT_PROMPTS["clinic_info"],
+        system_prompt=get_prompt_template("clinic_info"),
+        prompt_key="clinic_info",
         model_config=COMPLEX_MODEL,
         tools=[
             "send_text_message",
@@ -71,7 +84,8 @@ AGENT_DEFINITIONS: List[AgentDefinition] = [
         agent_type=AgentType.SALES_CLOSER,  # Reusing type for scheduling
         name="scheduling_agent",
         description="Handles appointment booking flow - collects info and creates appointments",
-        system_prompt=AGENT_PROMPTS["scheduling"],
+        system_prompt=get_prompt_template("scheduling"),
+        prompt_key="scheduling",
         model_config=COMPLEX_MODEL,
         tools=[
             "send_text_message",
@@ -80,6 +94,7 @@ AGENT_DEFINITIONS: List[AgentDefinition] = [
             "get_services",
             "create_appointment",
             "send_appointment_confirmation",
+            "get_clinic_info",
         ],
         handoffs=[AgentType.PAYMENT, AgentType.SUPPORT],
     ),
@@ -89,13 +104,15 @@ AGENT_DEFINITIONS: List[AgentDefinition] = [
         agent_type=AgentType.PAYMENT,  # Reusing type for appointment management
         name="appointment_manager_agent",
         description="Manages existing appointments - view, cancel, reschedule",
-        system_prompt=AGENT_PROMPTS["appointment_manager"],
+        system_prompt=get_prompt_template("appointment_manager"),
+        prompt_key="appointment_manager",
         model_config=FAST_MODEL,
         tools=[
             "send_text_message",
             "get_patient_appointments",
             "cancel_appointment",
             "reschedule_appointment",
+            "get_clinic_info",
         ],
         handoffs=[AgentType.SALES_CLOSER, AgentType.SUPPORT],
     ),
@@ -105,11 +122,13 @@ AGENT_DEFINITIONS: List[AgentDefinition] = [
         agent_type=AgentType.SUPPORT,
         name="support_agent",
         description="Handles help requests, complaints, and escalation to human support",
-        system_prompt=AGENT_PROMPTS["support"],
+        system_prompt=get_prompt_template("support"),
+        prompt_key="support",
         model_config=FAST_MODEL,
         tools=[
             "send_text_message",
             "enable_human_takeover",
+            "get_clinic_info",
         ],
         handoffs=[],  # Support is the final escalation point
     ),
@@ -119,7 +138,8 @@ AGENT_DEFINITIONS: List[AgentDefinition] = [
         agent_type=AgentType.TRIAGE,
         name="triage_agent",
         description="Routes messages to the appropriate specialized agent",
-        system_prompt=AGENT_PROMPTS["triage"],
+        system_prompt=get_prompt_template("triage"),
+        prompt_key="triage",
         model_config=ROUTER_MODEL,
         tools=["send_text_message"],
         handoffs=[
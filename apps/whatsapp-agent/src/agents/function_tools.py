@@ -6,7 +6,7 @@ Tools for WhatsApp-based clinic appointment scheduling
 import asyncio
 import logging
 from datetime import datetime, timedelta, timezone
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 from agents import function_tool, RunContextWrapper  # type: ignore
 
@@ -161,6 +161,35 @@ def _get_clinic_info_impl(runtime: Optional['Runtime'] = None) -> str:
         if hasattr(clinic, 'phone') and clinic.phone:
             lines.append(f"\n📞 *Telefone:* {clinic.phone}")
 
+        # Summary, info-mode texts and FAQ (no longer inlined in the prompts)
+        summary = (getattr(clinic, 'greeting_summary', '') or '').strip()
+        if not summary:
+            description = (getattr(clinic, 'description', '') or '').strip()
+            summary = description.split(".")[0].strip() or description[:180].strip()
+        if summary:
+            lines.append(f"\n📝 *Sobre:* {summary}")
+
+        welcome = (getattr(clinic, 'workflow_welcome_message', '') or '').strip()
+        if welcome:
+            lines.append(f"\n👋 *Boas-vindas:* {welcome}")
+
+        cta = (getattr(clinic, 'workflow_cta', '') or '').strip()
+        if cta:
+            lines.append(f"\n➡️ *Próximo passo sugerido:* {cta}")
+
+        faqs = getattr(clinic, 'workflow_faqs', None) or []
+        faq_lines = []
+        for item in faqs[:12]:
+            if not isinstance(item, dict):
+                continue
+            question = (item.get("question") or "").strip()
+            if not question:
+                continue
+            answer = (item.get("answer") or "").strip() or "[sem resposta cadastrada]"
+            faq_lines.append(f"- P: {question}\n  R: {answer}")
+        if faq_lines:
+            lines.append("\n❓ *FAQ da clínica:*\n" + "\n".join(faq_lines))
+
         # Payment info
         payment_settings = getattr(clinic, 'payment_settings', None)
         if payment_settings:
@@ -196,7 +225,8 @@ async def get_clinic_info(ctx: RunContextWrapper[Runtime]) -> str:
     """
     Get information about the clinic.
 
-    Returns clinic details including address, opening hours, phone, and payment options.
+    Returns clinic details including address, opening hours, phone, payment
+    options, a short description and the clinic FAQ.
 
     Returns:
         Formatted clinic information.
@@ -224,16 +254,17 @@ def _get_professionals_impl(service_id: Optional[str] = None, runtime: Optional[
             if not professionals:
                 return "Não há profissionais disponíveis para este serviço."
 
-        vc = get_vertical_config(getattr(runtime, 'vertical_slug', None))
+        vertical_slug = runtime.vertical_slug
+        vc = get_vertical_config(vertical_slug)
         lines = [f"{vc.terminology.professional_emoji} *Nossos Profissionais:*\n"]
 
         for prof in professionals:
-            name = prof.full_name if hasattr(prof, 'full_name') else prof.name
-            specialties = getattr(prof, 'specialties', []) or []
+            # Professional always defines these fields (see scheduler.models)
+            name = prof.full_name or prof.name
+            specialties = prof.specialties
             if not specialties:
-                legacy_specialty = getattr(prof, 'specialty', '') or ''
-                specialties = [legacy_specialty] if legacy_specialty else []
-            specialty_display = [get_specialty_name(getattr(runtime, 'vertical_slug', None), s) for s in specialties if s]
+                specialties = [prof.specialty] if prof.specialty else []
+            specialty_display = [get_specialty_name(vertical_slug, s) for s in specialties if s]
             specialty = ", ".join(dict.fromkeys(specialty_display))
             line = f"• *{name}*"
             if specialty:
@@ -277,9 +308,10 @@ def _get_services_impl(runtime: Optional['Runtime'] = None) -> str:
         lines = [f"{vc.terminology.service_emoji} *Serviços Disponíveis:*\n"]
 
         for service in services:
-            name = getattr(service, "name", "Serviço")
-            duration = getattr(service, "duration_minutes", 30)
-            price_cents = getattr(service, "price_cents", 0)
+            # Service always defines these fields (see scheduler.models)
+            name = service.name or "Serviço"
+            duration = service.duration_minutes or 30
+            price_cents = service.price_cents or 0
             price = price_cents / 100 if price_cents else 0
 
             line = f"• *{name}*"
@@ -396,19 +428,19 @@ async def _create_appointment_impl(
         if runtime is None:
             runtime = get_runtime()
         from src.scheduler.appointments import create_appointment
-        from src.scheduler.availability import get_professional_availability
+        from src.scheduler.availability import check_slot_availability
 
         phone = ensure_phone_has_plus(phone)
 
-        # Validate time slot is available
-        available = get_professional_availability(
-            runtime.db, runtime.clinic_id, professional_id, date
+        # Validate time slot is available (reuses the professional it reads)
+        available, professional = check_slot_availability(
+            runtime.db, runtime.clinic_id, professional_id, date, time
         )
-        if time not in available:
+        if not available:
             return f"❌ O horário {time} não está mais disponível em {date}. Por favor, escolha outro horário."
 
-        # Get professional name
-        professional = runtime.db.get_professional(runtime.clinic_id, professional_id)
+        # Usually served from the clinic read cache
+        clinic = runtime.db.get_clinic(runtime.clinic_id)
         prof_name = professional.full_name if professional else "Profissional"
 
         # Get service price if specified
@@ -423,7 +455,6 @@ async def _create_appointment_impl(
                 duration_minutes = getattr(service, "duration_minutes", 30) or 30
 
         # Get clinic's deposit percentage and payment settings
-        clinic = runtime.db.get_clinic(runtime.clinic_id)
         signal_percentage = clinic.signal_percentage if clinic else 0
         payment_settings = getattr(clinic, "payment_settings", {}) if clinic else {}
         requires_deposit = payment_settings.get("requiresDeposit", False)
@@ -740,7 +771,7 @@ async def _reschedule_appointment_impl(
         if runtime is None:
             runtime = get_runtime()
         from src.scheduler.appointments import reschedule_appointment
-        from src.scheduler.availability import get_professional_availability
+        from src.scheduler.availability import is_slot_available
 
         # Get the appointment to find professional ID
         appointment = runtime.db.get_appointment(runtime.clinic_id, appointment_id)
@@ -748,10 +779,9 @@ async def _reschedule_appointment_impl(
             return "Agendamento não encontrado."
 
         # Check new slot availability
-        available = get_professional_availability(
-            runtime.db, runtime.clinic_id, appointment.professional_id, new_date
-        )
-        if new_time not in available:
+        if not is_slot_available(
+            runtime.db, runtime.clinic_id, appointment.professional_id, new_date, new_time
+        ):
             return f"❌ O horário {new_time} não está disponível em {new_date}. Por favor, escolha outro horário."
 
         # Reschedule
@@ -841,11 +871,11 @@ async def _enable_human_takeover_impl(phone: str, reason: str, runtime: Optional
         await send_whatsapp_text(phone, notification_message)
         _mark_message_sent(phone, runtime=runtime)
 
-        logger.info(f"👋 Human takeover enabled for {phone}: {reason}")
+        logger.info("👋 Human takeover enabled for %s: %s", phone, reason)
         return f"Human takeover enabled for {phone}. Reason: {reason}"
 
     except Exception as e:
-        logger.error(f"Error enabling human takeover: {e}")
+        logger.error("Error enabling human takeover: %s", e)
         return f"Error enabling human takeover: {str(e)}"
 
 
@@ -873,6 +903,57 @@ async def enable_human_takeover(ctx: RunContextWrapper[Runtime], phone: str, rea
 
 # ===== TOOL REGISTRY =====
 
+_DEFAULT_TOOLS = (send_text_message,)
+
+# Built once at import; tuples so the shared registry can't be mutated
+_TOOL_MAP: Dict[str, Tuple[Any, ...]] = {
+    # Greeter - welcomes patients
+    'greeter_agent': (
+        send_text_message,
+    ),
+
+    # Clinic Info - answers questions about the clinic
+    'clinic_info_agent': (
+        send_text_message,
+        get_clinic_info,
+        get_professionals,
+        get_services,
+    ),
+
+    # Scheduling - handles appointment booking
+    'scheduling_agent': (
+        send_text_message,
+        get_services,
+        get_professionals,
+        get_available_slots,
+        create_appointment,
+        send_appointment_confirmation,
+        get_clinic_info,
+    ),
+
+    # Appointment Manager - view/cancel/reschedule
+    'appointment_manager_agent': (
+        send_text_message,
+        get_patient_appointments,
+        cancel_appointment,
+        reschedule_appointment,
+        get_clinic_info,
+    ),
+
+    # Support - human escalation
+    'support_agent': (
+        send_text_message,
+        enable_human_takeover,
+        get_clinic_info,
+    ),
+
+    # Triage - routes to other agents (only needs send_text_message for emergencies)
+    'triage_agent': (
+        send_text_message,
+    ),
+}
+
+
 def get_tools_for_agent(agent_name: str) -> List[Any]:
     """
     Get the appropriate tools for each agent type.
@@ -881,50 +962,6 @@ def get_tools_for_agent(agent_name: str) -> List[Any]:
         agent_name: Name of the agent (greeter, clinic_info, scheduling, etc.)
 
     Returns:
-        List of function tools.
+        List of function tools (a fresh list; the SDK agent owns it).
     """
-    tool_map = {
-        # Greeter - welcomes patients
-        'greeter_agent': [
-            send_text_message,
-        ],
-
-        # Clinic Info - answers questions about the clinic
-        'clinic_info_agent': [
-            send_text_message,
-            get_clinic_info,
-            get_professionals,
-            get_services,
-        ],
-
-        # Scheduling - handles appointment booking
-        'scheduling_agent': [
-            send_text_message,
-            get_services,
-            get_professionals,
-            get_available_slots,
-            create_appointment,
-            send_appointment_confirmation,
-        ],
-
-        # Appointment Manager - view/cancel/reschedule
-        'appointment_manager_agent': [
-            send_text_message,
-            get_patient_appointments,
-            cancel_appointment,
-            reschedule_appointment,
-        ],
-
-        # Support - human escalation
-        'support_agent': [
-            send_text_message,
-            enable_human_takeover,
-        ],
-
-        # Triage - routes to other agents (only needs send_text_message for emergencies)
-        'triage_agent': [
-            send_text_message,
-        ],
-    }
-
-    return tool_map.get(agent_name, [send_text_message])
+    return list(_TOOL_MAP.get(agent_name, _DEFAULT_TOOLS))
@@ -3,19 +3,214 @@ Gendei Agent Orchestrator
 Routes incoming WhatsApp messages to the appropriate AI agent.
 """
 
+import asyncio
 import logging
-from typing import Dict, Any, Optional, List
+import operator
+import os
+import re
+import time
+import unicodedata
+from collections import OrderedDict
+from functools import lru_cache
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Dict, Any, Mapping, Optional, List, Tuple
 
 from src.providers.base import AgentType, ExecutionResult
 from src.providers.openai.factory import OpenAIAgentFactory, OpenAIAgent
 from src.agents.definitions import get_all_agent_definitions
 from src.agents.function_tools import get_tools_for_agent
-from src.runtime.context import Runtime
-from src.vertical_config import get_vertical_config, get_specialty_name
+
+if TYPE_CHECKING:
+    from src.runtime.context import Runtime
 
 logger = logging.getLogger(__name__)
 
 
+@lru_cache(maxsize=1024)
+def _fold(text: str) -> str:
+    """Lowercase and strip accents, so keywords only need their ASCII form."""
+    return unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode("ascii").lower()
+
+
+# Pure greetings (exact match) -> greeter
+_GREETING_WORDS: Tuple[str, ...] = (
+    "oi", "ola", "bom dia", "boa tarde", "boa noite", "eae", "opa", "tudo bem",
+)
+_GREETINGS = frozenset(_GREETING_WORDS)
+# Greeting substrings only count for short messages ("oi!", "olá :)")
+_SHORT_GREETING_MAX_LEN = 10
+
+# Deterministic routing keywords, in priority order (first category wins).
+# Mirrors the TRIAGE_PROMPT rules so obvious intents skip the LLM triage hop.
+# Messages are folded with _fold() before matching, so list ASCII forms only.
+_ROUTING_RULES: Tuple[Tuple[AgentType, Tuple[str, ...]], ...] = (
+    (AgentType.GREETER, _GREETING_WORDS),
+    # Scheduling intent (check BEFORE info)
+    (AgentType.SALES_CLOSER, (  # scheduling
+        "agendar", "marcar", "horarios",
+        "disponibilidade", "agenda", "quero agendar",
+        "sessao", "procedimento", "tem horario",
+    )),
+    # Clinic info questions
+    (AgentType.PRODUCT_INFO, (  # clinic_info
+        "onde fica", "endereco", "localizacao",
+        "horario de funcionamento", "que horas", "funcionamento",
+        "quem atende", "medico", "profissional",
+        "convenio", "aceita", "pagamento",
+        "valor", "preco", "duracao", "quanto tempo",
+        "minutos", "servico", "especialidade",
+    )),
+    # Appointment management
+    (AgentType.PAYMENT, (  # appointment_manager
+        "minha consulta", "minhas consultas", "meu agendamento",
+        "minha sessao", "minhas sessoes",
+        "cancelar", "desmarcar", "remarcar", "reagendar",
+        "mudar horario",
+    )),
+    # Support/help
+    (AgentType.SUPPORT, (
+        "ajuda", "problema", "atendente", "humano", "reclamacao",
+    )),
+)
+
+# keyword -> priority (index into _ROUTING_RULES)
+_KEYWORD_PRIORITY: Dict[str, int] = {}
+for _priority, (_, _keywords) in enumerate(_ROUTING_RULES):
+    for _kw in _keywords:
+        _KEYWORD_PRIORITY.setdefault(_fold(_kw), _priority)
+
+# Messages shorter than every keyword can never match one
+_MIN_KEYWORD_LEN = min(map(len, _KEYWORD_PRIORITY))
+
+# One regex for every keyword. The lookahead makes matches zero-width so
+# overlapping keywords ("remarcar" / "marcar") are all reported, and the
+# alternatives are ordered by priority so the best keyword wins per position.
+_ROUTER_PATTERN = re.compile(
+    "(?=({}))".format("|".join(
+        re.escape(kw)
+        for kw in sorted(_KEYWORD_PRIORITY, key=lambda k: (_KEYWORD_PRIORITY[k], -len(k)))
+    ))
+)
+
+
+@lru_cache(maxsize=4096)
+def _route(msg_lower: str) -> AgentType:
+    """
+    Pick the starting agent for a folded, stripped message.
+
+    Pure function of the text, so repeated phrases ("oi", "quero agendar")
+    are answered from the cache.
+    """
+    # Pings, emoji-only (folded away) and numeric replies can't match a keyword
+    if len(msg_lower) < _MIN_KEYWORD_LEN or msg_lower.isdigit():
+        return AgentType.TRIAGE
+
+    # Pure greetings -> greeter
+    if msg_lower in _GREETINGS:
+        return AgentType.GREETER
+    short_message = len(msg_lower) < _SHORT_GREETING_MAX_LEN
+
+    # Single pass over the message; keep the highest-priority category
+    best: Optional[int] = None
+    for match in _ROUTER_PATTERN.finditer(msg_lower):
+        priority = _KEYWORD_PRIORITY[match.group(1)]
+        if priority == 0 and not short_message:
+            continue
+        if best is None or priority < best:
+            best = priority
+            if best == 0:
+                break
+    if best is not None:
+        return _ROUTING_RULES[best][0]
+
+    # Default to triage for complex messages
+    return AgentType.TRIAGE
+
+
+# Process-wide clinic context cache shared by all orchestrators:
+# clinic_id -> (expires_at monotonic seconds, context)
+CLINIC_CONTEXT_TTL_SECONDS = float(os.getenv("CLINIC_CONTEXT_TTL_SECONDS", "600"))
+# After a failed load, serve the stale/fallback context this long before retrying
+CLINIC_CONTEXT_RETRY_SECONDS = float(os.getenv("CLINIC_CONTEXT_RETRY_SECONDS", "30"))
+_clinic_context_cache: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+# Per-clinic locks so concurrent first messages trigger a single DB load
+_clinic_context_locks: Dict[str, asyncio.Lock] = {}
+_clinic_context_stats: Dict[str, int] = {"hits": 0, "misses": 0}
+
+
+def _get_cached_clinic_context(clinic_id: str) -> Optional[Dict[str, Any]]:
+    """Return the cached clinic context if it is still fresh."""
+    entry = _clinic_context_cache.get(clinic_id)
+    if entry and time.monotonic() < entry[0]:
+        return entry[1]
+    return None
+
+
+def invalidate_clinic_context(clinic_id: str) -> None:
+    """
+    Drop the cached context so the next message reloads clinic data.
+    Safe to call from any thread (registered as a database change listener).
+    """
+    _clinic_context_cache.pop(clinic_id, None)
+
+
+def _evict_clinic_context(clinic_id: str) -> None:
+    """Drop a clinic's cached context and its load lock (event loop thread only)."""
+    _clinic_context_cache.pop(clinic_id, None)
+    lock = _clinic_context_locks.get(clinic_id)
+    if lock is not None and not lock.locked():
+        del _clinic_context_locks[clinic_id]
+
+
+def get_clinic_context_cache_stats() -> Dict[str, int]:
+    """Hit/miss counters for the clinic context cache."""
+    return {**_clinic_context_stats, "size": len(_clinic_context_cache)}
+
+
+def get_routing_cache_stats() -> Dict[str, int]:
+    """Hit/miss counters for the message routing cache."""
+    info = _route.cache_info()
+    return {"hits": info.hits, "misses": info.misses, "size": info.currsize}
+
+# Professional projection helpers for the clinic context
+_professional_id_name = operator.attrgetter("id", "name")
+_MISSING = object()
+
+
+@lru_cache(maxsize=32)
+def _build_vertical_context(vertical_slug: str) -> Mapping[str, str]:
+    """
+    Build the prompt terminology for a vertical.
+
+    Depends only on the slug, so one read-only mapping is shared by every
+    clinic on the same vertical.
+    """
+    from src.vertical_config import get_vertical_config
+
+    vc = get_vertical_config(vertical_slug)
+    term = vc.terminology
+
+    # Build convenio instruction based on vertical features
+    convenio_instruction = ""
+    if vc.features.has_convenio:
+        convenio_instruction = f"- Convênio do {term.client_term} (se aplicável)"
+        if vc.features.ask_convenio_number:
+            convenio_instruction += "\n- Número da carteirinha do convênio"
+
+    return MappingProxyType({
+        "slug": vc.slug,
+        "appointment_term": term.appointment_term,
+        "appointment_plural": term.appointment_term_plural,
+        "appointment_term_upper": term.appointment_term_upper,
+        "appointment_plural_upper": term.appointment_term_plural_upper,
+        "client_term": term.client_term,
+        "professional_term": term.professional_term,
+        "professional_emoji": term.professional_emoji,
+        "service_emoji": term.service_emoji,
+        "convenio_instruction": convenio_instruction,
+    })
+
+
 class AgentOrchestrator:
     """
     Orchestrates AI agents for clinic message handling.
@@ -32,22 +227,84 @@ class AgentOrchestrator:
         """
         self.clinic_id = clinic_id
         self.db = db
+        # Session IDs are "<clinic_id>:<phone>"
+        self._session_prefix = clinic_id + ":"
         self.factory = OpenAIAgentFactory()
         self.runner = self.factory.get_runner()
         self._agents: Optional[Dict[AgentType, OpenAIAgent]] = None
+        # Context the current agents were built from
         self._clinic_context: Optional[Dict[str, Any]] = None
+        # Serializes agent builds between the warm-up task and first messages
+        self._agents_lock = asyncio.Lock()
+        self._warm_task: Optional["asyncio.Task[None]"] = None
+
+    async def _load_clinic_context(self) -> Dict[str, Any]:
+        """Load clinic context for agent prompts (cached process-wide with a TTL)."""
+        context = _get_cached_clinic_context(self.clinic_id)
+        if context is not None:
+            _clinic_context_stats["hits"] += 1
+            return context
+
+        lock = _clinic_context_locks.setdefault(self.clinic_id, asyncio.Lock())
+        async with lock:
+            # Another task may have loaded it while we waited
+            context = _get_cached_clinic_context(self.clinic_id)
+            if context is not None:
+                _clinic_context_stats["hits"] += 1
+                return context
+
+            _clinic_context_stats["misses"] += 1
+            context, loaded = await self._fetch_clinic_context()
+            if loaded:
+                _clinic_context_cache[self.clinic_id] = (time.monotonic() + CLINIC_CONTEXT_TTL_SECONDS, context)
+                return context
+
+            # Keep serving the stale context rather than the bare fallback, and
+            # hold on to it for a short while so an outage doesn't trigger a
+            # reload (and an agent rebuild) on every message
+            stale = _clinic_context_cache.get(self.clinic_id)
+            if stale is not None:
+                context = stale[1]
+            _clinic_context_cache[self.clinic_id] = (time.monotonic() + CLINIC_CONTEXT_RETRY_SECONDS, context)
+            return context
+
+    async def _fetch_clinic_context(self) -> Tuple[Dict[str, Any], bool]:
+        """Read clinic, professionals and services from the database.
+
+        The three reads are independent, so they run concurrently in worker
+        threads instead of blocking the event loop one after the other.
 
-    def _load_clinic_context(self) -> Dict[str, Any]:
-        """Load clinic context for agent prompts."""
-        if self._clinic_context:
-            return self._clinic_context
+        Returns:
+            (context, loaded) - loaded is False when any read failed
+        """
+        from src.vertical_config import get_specialty_name
 
-        context: Dict[str, Any] = {}
+        context: Dict[str, Any] = {"clinic_id": self.clinic_id}
         vertical_slug = "geral"
 
+        clinic, professionals, services = await asyncio.gather(
+            asyncio.to_thread(self.db.get_clinic, self.clinic_id),
+            asyncio.to_thread(self.db.get_clinic_professionals, self.clinic_id),
+            asyncio.to_thread(self.db.get_clinic_services, self.clinic_id),
+            return_exceptions=True,
+        )
+        loaded = True
+        for label, result in (
+            ("clinic", clinic), ("professionals", professionals), ("services", services)
+        ):
+            if isinstance(result, BaseException):
+                logger.error("Error loading clinic %s: %s", label, result)
+                loaded = False
+        if isinstance(clinic, BaseException):
+            clinic = None
+            context["clinic"] = {"name": "Clínica"}
+        if isinstance(professionals, BaseException):
+            professionals = []
+        if isinstance(services, BaseException):
+            services = []
+
         try:
-            # Load clinic info
-            clinic = self.db.get_clinic(self.clinic_id)
+            # Clinic info
             if clinic:
                 context["clinic"] = {
                     "name": clinic.name,
@@ -63,135 +320,93 @@ class AgentOrchestrator:
                     "workflow_faqs": getattr(clinic, 'workflow_faqs', []) or [],
                 }
 
-                # Load vertical config
+                # Vertical terminology (shared per slug)
                 vertical_slug = getattr(clinic, 'vertical', None) or 'geral'
-                vc = get_vertical_config(vertical_slug)
-                term = vc.terminology
-                context["vertical"] = {
-                    "slug": vc.slug,
-                    "appointment_term": term.appointment_term,
-                    "appointment_plural": term.appointment_term_plural,
-                    "client_term": term.client_term,
-                    "professional_term": term.professional_term,
-                    "professional_emoji": term.professional_emoji,
-                    "service_emoji": term.service_emoji,
-                }
-                # Build convenio instruction based on vertical features
-                if vc.features.has_convenio:
-                    convenio_text = "- Convênio do {client_term} (se aplicável)".format(
-                        client_term=term.client_term
-                    )
-                    if vc.features.ask_convenio_number:
-                        convenio_text += "\n- Número da carteirinha do convênio"
-                    context["vertical"]["convenio_instruction"] = convenio_text
-                else:
-                    context["vertical"]["convenio_instruction"] = ""
-
-            # Load professionals
-            professionals = self.db.get_clinic_professionals(self.clinic_id)
+                context["vertical"] = _build_vertical_context(vertical_slug)
+
+            # Professionals
             if professionals:
                 def _specialty_display(prof: Any) -> str:
                     raw_specialties = getattr(prof, 'specialties', []) or []
                     if not raw_specialties:
                         legacy = getattr(prof, 'specialty', '') or ''
                         raw_specialties = [legacy] if legacy else []
-                    display = [get_specialty_name(vertical_slug, s) for s in raw_specialties if s]
-                    return ", ".join(dict.fromkeys(display))
-
-                context["professionals"] = [
-                    {
-                        "id": p.id,
-                        "name": p.name,
-                        "full_name": getattr(p, 'full_name', p.name),
+                    # Single pass de-dup, preserving order
+                    seen = set()
+                    display = []
+                    for s in raw_specialties:
+                        if not s:
+                            continue
+                        name = get_specialty_name(vertical_slug, s)
+                        if name not in seen:
+                            seen.add(name)
+                            display.append(name)
+                    return ", ".join(display)
+
+                profs_out: List[Dict[str, Any]] = []
+                append = profs_out.append
+                for p in professionals:
+                    pid, pname = _professional_id_name(p)
+                    full_name = getattr(p, 'full_name', _MISSING)
+                    append({
+                        "id": pid,
+                        "name": pname,
+                        "full_name": pname if full_name is _MISSING else full_name,
                         "specialty": _specialty_display(p),
-                    }
-                    for p in professionals
-                ]
+                    })
+                context["professionals"] = profs_out
 
-            # Load services
-            services = self.db.get_clinic_services(self.clinic_id)
+            # Services
             if services:
                 context["services"] = services
 
         except Exception as e:
-            logger.error(f"Error loading clinic context: {e}")
+            logger.error("Error loading clinic context: %s", e)
             context["clinic"] = {"name": "Clínica"}
+            return context, False
 
-        self._clinic_context = context
-        return context
+        return context, loaded
 
-    def _get_agents(self) -> Dict[AgentType, OpenAIAgent]:
+    async def _get_agents(self) -> Dict[AgentType, OpenAIAgent]:
         """Get or create agents for this clinic."""
-        if self._agents:
+        # Load context and (re)create agents when it was refreshed
+        context = await self._load_clinic_context()
+        if self._agents and self._clinic_context is context:
             return self._agents
 
-        # Load context and create agents
-        context = self._load_clinic_context()
-        definitions = get_all_agent_definitions()
+        async with self._agents_lock:
+            # The warm-up task may have built them while we waited
+            if self._agents and self._clinic_context is context:
+                return self._agents
+
+            definitions = get_all_agent_definitions()
 
-        self._agents = self.factory.create_all_agents(definitions, context)
-        logger.info(f"Created {len(self._agents)} agents for clinic {self.clinic_id}")
+            self._agents = self.factory.create_all_agents(definitions, context)
+            self._clinic_context = context
+            logger.info("Created %d agents for clinic %s", len(self._agents), self.clinic_id)
 
-        return self._agents
+            return self._agents
+
+    async def _warm(self) -> None:
+        """Load clinic context and build agents ahead of the first message."""
+        try:
+            await self._get_agents()
+        except Exception as e:
+            logger.warning("Agent warm-up failed for clinic %s: %s", self.clinic_id, e)
 
     def _select_starting_agent(self, message: str) -> AgentType:
         """
         Select the starting agent based on message content.
         Uses deterministic routing for common patterns.
         """
-        msg_lower = message.lower().strip()
-
-        # Pure greetings -> greeter
-        greetings = ["oi", "olá", "ola", "bom dia", "boa tarde", "boa noite", "eae", "opa"]
-        if msg_lower in greetings or (len(msg_lower) < 10 and any(g in msg_lower for g in greetings)):
-            return AgentType.GREETER
-
-        # Scheduling intent (check BEFORE info)
-        scheduling_keywords = [
-            "agendar", "marcar", "horários", "horarios",
-            "disponibilidade", "agenda", "quero agendar",
-            "sessão", "sessao", "procedimento",
-        ]
-        if any(kw in msg_lower for kw in scheduling_keywords):
-            return AgentType.SALES_CLOSER  # scheduling
-
-        # Clinic info questions
-        info_keywords = [
-            "onde fica", "endereço", "endereco", "localização", "localizacao",
-            "horário de funcionamento", "que horas", "funcionamento",
-            "quem atende", "médico", "medico", "profissional",
-            "convênio", "convenio", "aceita", "pagamento",
-            "valor", "preço", "preco", "duração", "duracao", "quanto tempo",
-            "minutos", "serviço", "servico",
-        ]
-        if any(kw in msg_lower for kw in info_keywords):
-            return AgentType.PRODUCT_INFO  # clinic_info
-
-        # Appointment management
-        appointment_keywords = [
-            "minha consulta", "minhas consultas", "meu agendamento",
-            "minha sessão", "minha sessao", "minhas sessões", "minhas sessoes",
-            "cancelar", "desmarcar", "remarcar", "reagendar",
-        ]
-        if any(kw in msg_lower for kw in appointment_keywords):
-            return AgentType.PAYMENT  # appointment_manager
-
-        # Support/help
-        support_keywords = [
-            "ajuda", "problema", "atendente", "humano", "reclamação", "reclamacao",
-        ]
-        if any(kw in msg_lower for kw in support_keywords):
-            return AgentType.SUPPORT
-
-        # Default to triage for complex messages
-        return AgentType.TRIAGE
+        return _route(_fold(message).strip())
 
     async def process_message(
         self,
         phone: str,
         message: str,
         contact_name: Optional[str] = None,
-        runtime: Optional[Runtime] = None
+        runtime: Optional["Runtime"] = None
     ) -> ExecutionResult:
         """
         Process an incoming message and get an AI response.
@@ -206,55 +421,79 @@ class AgentOrchestrator:
             ExecutionResult with the agent's response
         """
         try:
-            agents = self._get_agents()
+            agents = await self._get_agents()
 
             # Select starting agent
             agent_type = self._select_starting_agent(message)
             agent = agents.get(agent_type)
 
             if not agent:
-                logger.error(f"Agent {agent_type} not found")
+                logger.error("Agent %s not found", agent_type)
                 return ExecutionResult(
                     success=False,
                     error=f"Agent {agent_type} not available"
                 )
 
-            logger.info(f"Routing to {agent.name} for message: {message[:50]}...")
-
-            # Build context
-            context = {
-                "phone": phone,
-                "patient_name": contact_name,
-                "clinic_id": self.clinic_id,
-            }
-
-            # Create session ID
-            session_id = f"{self.clinic_id}:{phone}"
+            logger.info("Routing to %s for message: %.50s...", agent.name, message)
 
             # Run the agent with Runtime context for SDK RunContextWrapper
             result = await self.runner.run(
-                agent, message, session_id, context,
+                agent, message, self._session_prefix + phone,
+                {"phone": phone, "patient_name": contact_name, "clinic_id": self.clinic_id},
                 runtime=runtime
             )
 
-            logger.info(f"Agent {agent.name} responded: {result.success}")
+            logger.info("Agent %s responded: %s", agent.name, result.success)
 
             return result
 
         except Exception as e:
-            logger.error(f"Error processing message: {e}")
+            logger.error("Error processing message: %s", e)
             return ExecutionResult(
                 success=False,
                 error=str(e)
             )
 
 
-# Global orchestrator cache per clinic
-_orchestrators: Dict[str, AgentOrchestrator] = {}
+# Global orchestrator cache per clinic, bounded LRU (most recently used last)
+MAX_ORCHESTRATORS = int(os.getenv("MAX_ORCHESTRATORS", "256"))
+_orchestrators: "OrderedDict[str, AgentOrchestrator]" = OrderedDict()
+_orchestrator_stats: Dict[str, int] = {"hits": 0, "misses": 0, "evictions": 0}
 
 
 def get_orchestrator(clinic_id: str, db: Any) -> AgentOrchestrator:
     """Get or create an orchestrator for a clinic."""
-    if clinic_id not in _orchestrators:
-        _orchestrators[clinic_id] = AgentOrchestrator(clinic_id, db)
-    return _orchestrators[clinic_id]
+    orchestrator = _orchestrators.get(clinic_id)
+    if orchestrator is not None:
+        _orchestrator_stats["hits"] += 1
+        _orchestrators.move_to_end(clinic_id)
+        return orchestrator
+
+    _orchestrator_stats["misses"] += 1
+    orchestrator = AgentOrchestrator(clinic_id, db)
+    _orchestrators[clinic_id] = orchestrator
+
+    # Start building agents in the background; without a running loop they
+    # are built on the first message instead
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        loop = None
+    if loop is not None:
+        orchestrator._warm_task = loop.create_task(orchestrator._warm())
+
+    while len(_orchestrators) > MAX_ORCHESTRATORS:
+        evicted_id, evicted = _orchestrators.popitem(last=False)
+        # Release the cached agents; in-flight messages keep their own reference
+        evicted._agents = None
+        evicted._clinic_context = None
+        _evict_clinic_context(evicted_id)
+        _orchestrator_stats["evictions"] += 1
+        logger.debug("Evicted orchestrator for clinic %s", evicted_id)
+
+    return orchestrator
+
+
+def get_orchestrator_cache_stats() -> Dict[str, int]:
+    """Hit/miss/eviction counters for the orchestrator cache."""
+    return {**_orchestrator_stats, "size": len(_orchestrators)}
@@ -4,11 +4,14 @@ System prompts for clinic appointment scheduling agents.
 Supports vertical-specific terminology via placeholders.
 
 All agents participating in handoffs include RECOMMENDED_PROMPT_PREFIX
-as recommended by the OpenAI Agents SDK documentation.
+as recommended by the OpenAI Agents SDK documentation. AGENT_PROMPTS
+holds the agent-specific bodies; get_prompt_template() and
+format_prompt() prepend the shared prefix.
 
 Placeholders used:
   {clinic_name}        - Clinic name
-  {clinic_context}     - Formatted clinic info (address, hours, etc.)
+  {clinic_context}     - Formatted clinic info (greeter only; the other
+                         agents call get_clinic_info())
   {appointment_term}   - "consulta", "sessão", "procedimento", "atendimento"
   {appointment_plural} - "consultas", "sessões", "procedimentos"
   {client_term}        - "paciente", "cliente"
@@ -18,15 +21,39 @@ Placeholders used:
   {no_emoji_reason}    - "ambiente profissional" (always)
 """
 
+import hashlib
+import os
+import re
+import sys
+from dataclasses import dataclass
+from functools import lru_cache
+from string import Formatter
+from types import MappingProxyType
+from typing import Dict, Mapping, Optional, Tuple
+
 from agents.extensions.handoff_prompt import RECOMMENDED_PROMPT_PREFIX  # type: ignore
 
-_PREFIX = RECOMMENDED_PROMPT_PREFIX + "\n\n"
+# Shared by every agent; prepended once by get_prompt_template
+_PREFIX = sys.intern(RECOMMENDED_PROMPT_PREFIX + "\n\n")
 
-# Greeter Agent - First contact
-GREETER_PROMPT = _PREFIX + """Você é o assistente virtual da {clinic_name}.
+# Per-clinic values go last so the instructions above them form a prefix
+# shared by every clinic of a vertical (provider prompt caching).
+_CLINIC_CONTEXT_BLOCK = """
+
+**CONTEXTO DA CLÍNICA:**
+Clínica: {clinic_name}
+{clinic_context}"""
+
+# Agents with get_clinic_info() fetch the clinic details on demand, so only
+# the name is rendered per clinic and the rest of the prompt is shared.
+_CLINIC_NAME_BLOCK = """
 
 **CONTEXTO DA CLÍNICA:**
-{clinic_context}
+Clínica: {clinic_name}
+Endereço, horário, pagamentos e FAQ: use get_clinic_info()."""
+
+# Greeter Agent - First contact
+GREETER_PROMPT = """Você é o assistente virtual da clínica apresentada em CONTEXTO DA CLÍNICA, ao final destas instruções.
 
 **SUA FUNÇÃO:** Dar as boas-vindas ao {client_term} e entender o que ele precisa.
 
@@ -57,15 +84,11 @@ GREETER_PROMPT = _PREFIX + """Você é o assistente virtual da {clinic_name}.
 - Tom cordial e profissional
 
 **FERRAMENTAS:**
-- send_text_message(phone, text) → Para respostas simples
-"""
+- send_text_message(phone, text) → Para respostas simples"""
 
 
 # Clinic Info Agent - Answers questions about the clinic
-CLINIC_INFO_PROMPT = _PREFIX + """Você é o assistente virtual da clínica {clinic_name}.
-
-**CONTEXTO DA CLÍNICA:**
-{clinic_context}
+CLINIC_INFO_PROMPT = """Você é o assistente virtual da clínica apresentada em CONTEXTO DA CLÍNICA, ao final destas instruções.
 
 **SUA FUNÇÃO:** Responder perguntas sobre a clínica.
 
@@ -77,7 +100,7 @@ CLINIC_INFO_PROMPT = _PREFIX + """Você é o assistente virtual da clínica {cli
 - Formas de pagamento aceitas
 
 **FERRAMENTAS DISPONÍVEIS:**
-- get_clinic_info() → Retorna informações gerais da clínica
+- get_clinic_info() → Retorna informações gerais da clínica (inclui FAQ)
 - get_professionals() → Lista de profissionais
 - get_services() → Lista de serviços
 
@@ -90,6 +113,7 @@ CLINIC_INFO_PROMPT = _PREFIX + """Você é o assistente virtual da clínica {cli
 6. Se houver apenas 1 serviço disponível, responda diretamente com valor e duração sem pedir mais dados
 7. Se houver vários serviços/profissionais, peça para escolher qual deseja
 8. Se perguntarem sobre FORMAS DE PAGAMENTO ou COMO PAGAR → Use get_clinic_info() e informe os metodos de pagamento disponiveis (particular/convenio e metodos do sinal como cartao de credito e/ou PIX)
+9. Se a pergunta estiver na FAQ da clínica → Use get_clinic_info() e responda com a resposta cadastrada
 
 **FORMATAÇÃO:**
 - Respostas claras e organizadas
@@ -101,10 +125,7 @@ CLINIC_INFO_PROMPT = _PREFIX + """Você é o assistente virtual da clínica {cli
 
 
 # Scheduling Agent - Handles appointment booking
-SCHEDULING_PROMPT = _PREFIX + """Você é o assistente de agendamento da clínica {clinic_name}.
-
-**CONTEXTO DA CLÍNICA:**
-{clinic_context}
+SCHEDULING_PROMPT = """Você é o assistente de agendamento da clínica apresentada em CONTEXTO DA CLÍNICA, ao final destas instruções.
 
 **SUA FUNÇÃO:** Ajudar o {client_term} a agendar uma {appointment_term}.
 
@@ -123,6 +144,7 @@ SCHEDULING_PROMPT = _PREFIX + """Você é o assistente de agendamento da clínic
 - get_available_slots(professional_id, date) → Horários disponíveis
 - create_appointment(data) → Cria o agendamento
 - send_appointment_confirmation(appointment_id) → Envia confirmação
+- get_clinic_info() → Endereço, horário e formas de pagamento da clínica
 
 **INFORMAÇÕES NECESSÁRIAS PARA AGENDAR:**
 - Serviço/especialidade desejada
@@ -150,10 +172,7 @@ SCHEDULING_PROMPT = _PREFIX + """Você é o assistente de agendamento da clínic
 
 
 # Appointment Manager Agent - View/cancel/reschedule
-APPOINTMENT_MANAGER_PROMPT = _PREFIX + """Você é o assistente de {appointment_plural} da clínica {clinic_name}.
-
-**CONTEXTO DA CLÍNICA:**
-{clinic_context}
+APPOINTMENT_MANAGER_PROMPT = """Você é o assistente de {appointment_plural} da clínica apresentada em CONTEXTO DA CLÍNICA, ao final destas instruções.
 
 **SUA FUNÇÃO:** Ajudar o {client_term} a gerenciar suas {appointment_plural} existentes.
 
@@ -166,6 +185,7 @@ APPOINTMENT_MANAGER_PROMPT = _PREFIX + """Você é o assistente de {appointment_
 - get_patient_appointments(phone) → Lista {appointment_plural} do {client_term}
 - cancel_appointment(appointment_id, reason) → Cancela {appointment_term}
 - reschedule_appointment(appointment_id, new_date, new_time) → Remarca
+- get_clinic_info() → Endereço, horário e telefone da clínica
 
 **COMPORTAMENTO:**
 - Primeiro identifique o que o {client_term} quer fazer
@@ -182,10 +202,7 @@ APPOINTMENT_MANAGER_PROMPT = _PREFIX + """Você é o assistente de {appointment_
 
 
 # Support Agent - Human escalation
-SUPPORT_PROMPT = _PREFIX + """Você é o suporte da clínica {clinic_name}.
-
-**CONTEXTO DA CLÍNICA:**
-{clinic_context}
+SUPPORT_PROMPT = """Você é o suporte da clínica apresentada em CONTEXTO DA CLÍNICA, ao final destas instruções.
 
 **SUA FUNÇÃO:** Ajudar com problemas e escalar para atendimento humano quando necessário.
 
@@ -200,6 +217,7 @@ SUPPORT_PROMPT = _PREFIX + """Você é o suporte da clínica {clinic_name}.
 **FERRAMENTAS:**
 - send_text_message(phone, mensagem) → Responder ao {client_term}
 - enable_human_takeover(phone, reason) → Transferir para atendimento humano
+- get_clinic_info() → Telefone, endereço, horário e FAQ da clínica
 
 **COMPORTAMENTO:**
 1. Seja empático e acolhedor
@@ -216,7 +234,7 @@ SUPPORT_PROMPT = _PREFIX + """Você é o suporte da clínica {clinic_name}.
 
 
 # Triage Agent - Intelligent router
-TRIAGE_PROMPT = _PREFIX + """Você é o ROTEADOR inteligente da clínica.
+TRIAGE_PROMPT = """Você é o ROTEADOR inteligente da clínica.
 
 **SUA FUNÇÃO:** Identificar a intenção do {client_term} e direcionar para o agente certo.
 
@@ -256,15 +274,120 @@ TRIAGE_PROMPT = _PREFIX + """Você é o ROTEADOR inteligente da clínica.
 **AÇÃO:** Transfira IMEDIATAMENTE para o agente correto. NÃO responda diretamente."""
 
 
-# All prompts dictionary
-AGENT_PROMPTS = {
-    "greeter": GREETER_PROMPT,
-    "clinic_info": CLINIC_INFO_PROMPT,
-    "scheduling": SCHEDULING_PROMPT,
-    "appointment_manager": APPOINTMENT_MANAGER_PROMPT,
-    "support": SUPPORT_PROMPT,
-    "triage": TRIAGE_PROMPT,
-}
+@dataclass(frozen=True, slots=True)
+class PromptSpec:
+    """Agent prompt split at the per-clinic boundary."""
+    static: str   # Instructions; only vertical placeholders, shared across clinics
+    dynamic: str  # Trailing per-clinic block ({clinic_name}, {clinic_context})
+
+
+PROMPT_SPECS: Mapping[str, PromptSpec] = MappingProxyType({
+    "greeter": PromptSpec(GREETER_PROMPT, _CLINIC_CONTEXT_BLOCK),
+    "clinic_info": PromptSpec(CLINIC_INFO_PROMPT, _CLINIC_NAME_BLOCK),
+    "scheduling": PromptSpec(SCHEDULING_PROMPT, _CLINIC_NAME_BLOCK),
+    "appointment_manager": PromptSpec(APPOINTMENT_MANAGER_PROMPT, _CLINIC_NAME_BLOCK),
+    "support": PromptSpec(SUPPORT_PROMPT, _CLINIC_NAME_BLOCK),
+    "triage": PromptSpec(TRIAGE_PROMPT, ""),
+})
+
+# A per-clinic field in the static part would break the shared prefix
+for _key, _spec in PROMPT_SPECS.items():
+    assert "{clinic_name}" not in _spec.static and "{clinic_context}" not in _spec.static, _key
+del _key, _spec
+
+# All prompt bodies (without _PREFIX); read-only and interned
+AGENT_PROMPTS: Mapping[str, str] = MappingProxyType(
+    {key: sys.intern(spec.static + spec.dynamic) for key, spec in PROMPT_SPECS.items()}
+)
+
+
+def _compile(template: str) -> Tuple[Tuple[str, Optional[str]], ...]:
+    """Split a template into (literal, field_name) segments once."""
+    segments = []
+    for literal, field_name, format_spec, conversion in Formatter().parse(template):
+        # Templates only use bare {name} fields
+        assert not format_spec and conversion is None, field_name
+        segments.append((literal, field_name))
+    return tuple(segments)
+
+
+# Opt-in token trimming of the templates (see _minify)
+PROMPT_MINIFY = os.getenv("PROMPT_MINIFY", "false").strip().lower() in {"1", "true", "yes"}
+
+_TRAILING_SPACE_RE = re.compile(r"[ \t]+\n")
+_BLANK_RUN_RE = re.compile(r"\n{3,}")
+
+
+def _minify(template: str) -> str:
+    """Drop trailing spaces, extra blank lines and ** bold markers."""
+    template = _TRAILING_SPACE_RE.sub("\n", template)
+    template = _BLANK_RUN_RE.sub("\n\n", template)
+    return template.replace("**", "")
+
+
+@lru_cache(maxsize=None)
+def get_prompt_template(prompt_key: str) -> str:
+    """Return the full, unformatted template (_PREFIX + body) for an agent."""
+    template = _PREFIX + AGENT_PROMPTS[prompt_key]
+    return sys.intern(_minify(template) if PROMPT_MINIFY else template)
+
+
+# Short content hash per template; changes whenever a prompt is edited, so
+# cache keys and metrics that include it follow prompt releases.
+PROMPT_VERSIONS: Mapping[str, str] = MappingProxyType({
+    key: hashlib.blake2b(get_prompt_template(key).encode("utf-8"), digest_size=8).hexdigest()
+    for key in AGENT_PROMPTS
+})
+
+# Parsed once at import; format_prompt only joins the fragments
+AGENT_PROMPTS_COMPILED = MappingProxyType(
+    {key: _compile(get_prompt_template(key)) for key in AGENT_PROMPTS}
+)
+
+
+class _Defaulting(dict):
+    """Mapping for str.format_map that leaves unknown placeholders intact."""
+
+    def __missing__(self, key: str) -> str:
+        return "{" + key + "}"
+
+
+# Placeholders fixed by the clinic vertical (same for every tenant in it)
+_VERTICAL_KEYS = frozenset({
+    "appointment_term",
+    "appointment_plural",
+    "appointment_term_upper",
+    "appointment_plural_upper",
+    "client_term",
+    "professional_term",
+    "professional_emoji",
+    "convenio_instruction",
+    "no_emoji_reason",
+})
+
+
+@lru_cache(maxsize=32)
+def _vertical_templates(
+    vertical: Tuple[Tuple[str, str], ...],
+) -> Dict[str, Tuple[Tuple[str, Optional[str]], ...]]:
+    """Pre-render every prompt for one vertical, keeping per-clinic fields open."""
+    terms = dict(vertical)
+    specialized = {}
+    for key, segments in AGENT_PROMPTS_COMPILED.items():
+        merged = []
+        literal_run = ""
+        for literal, field_name in segments:
+            literal_run += literal
+            if field_name is None:
+                continue
+            if field_name in terms:
+                literal_run += terms[field_name]
+            else:
+                merged.append((literal_run, field_name))
+                literal_run = ""
+        merged.append((literal_run, None))
+        specialized[key] = tuple(merged)
+    return specialized
 
 
 def format_prompt(prompt_key: str, **kwargs) -> str:
@@ -275,22 +398,39 @@ def format_prompt(prompt_key: str, **kwargs) -> str:
         **kwargs: Values for placeholders. Expected keys:
             - clinic_name, clinic_context
             - appointment_term, appointment_plural, client_term
+            - appointment_term_upper, appointment_plural_upper
+              (precomputed by the vertical config)
             - professional_term, professional_emoji
             - convenio_instruction
+
+    Raises:
+        KeyError: If prompt_key is not in AGENT_PROMPTS.
+
+    Templates are pre-parsed into AGENT_PROMPTS_COMPILED at import, the
+    vertical terms are folded in once per vertical, and results are
+    memoized per (prompt_key, kwargs); call clear_prompt_caches() to drop
+    the memoized renders.
     """
-    template = AGENT_PROMPTS.get(prompt_key, "")
-    if not template:
-        return ""
-
-    # Compute derived uppercase values
-    kwargs.setdefault("appointment_term_upper", kwargs.get("appointment_term", "consulta").upper())
-    kwargs.setdefault("appointment_plural_upper", kwargs.get("appointment_plural", "consultas").upper())
-
-    # Safe format - ignore missing keys
-    try:
-        return template.format(**kwargs)
-    except KeyError:
-        # Fallback: replace what we can
-        for key, value in kwargs.items():
-            template = template.replace(f"{{{key}}}", str(value))
-        return template
+    items = tuple(sorted((key, str(value)) for key, value in kwargs.items()))
+    return _format_cached(prompt_key, items)
+
+
+@lru_cache(maxsize=512)
+def _format_cached(prompt_key: str, items: Tuple[Tuple[str, str], ...]) -> str:
+    # Vertical terms are already folded into the cached per-vertical templates
+    vertical = tuple(item for item in items if item[0] in _VERTICAL_KEYS)
+    # Unknown keys raise KeyError instead of yielding an empty system prompt
+    segments = _vertical_templates(vertical)[prompt_key]
+    kwargs = _Defaulting(items)
+
+    # Safe format - missing keys are left as literal placeholders
+    return "".join(
+        literal + kwargs[field_name] if field_name is not None else literal
+        for literal, field_name in segments
+    )
+
+
+def clear_prompt_caches() -> None:
+    """Drop the memoized prompt renders and per-vertical templates."""
+    _format_cached.cache_clear()
+    _vertical_templates.cache_clear()
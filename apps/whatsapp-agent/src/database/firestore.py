@@ -3,8 +3,15 @@
 
 import os
 import logging
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta
-from typing import Optional, List, Dict, Any
+from functools import cached_property, lru_cache
+from typing import Callable, Optional, List, Dict, Any, Iterator, Tuple
+from google.api_core import retry as api_retry
+from google.api_core.exceptions import Aborted, AlreadyExists, DeadlineExceeded, NotFound, ServiceUnavailable
+from google.auth.credentials import AnonymousCredentials
 from google.cloud import firestore
 
 from src.scheduler.models import (
@@ -24,20 +31,224 @@ PAYMENTS = "gendei_payments"
 TEMPLATES = "gendei_templates"
 TOKENS = "gendei_tokens"
 
+# Short-lived in-process cache for hot, rarely-changing webhook reads
+# (clinic docs, clinic-by-phone-number lookups, access tokens).
+READ_CACHE_TTL_SECONDS = float(os.getenv("DB_READ_CACHE_TTL_SECONDS", "60"))
+READ_CACHE_MAX_ENTRIES = 1024
+# Message IDs this process has already claimed, checked before Firestore
+SEEN_MESSAGES_MAX_ENTRIES = 50_000
+_MISS = object()
+
+# Firestore caps a WriteBatch at 500 writes and a 10 MiB request payload;
+# flush a little before the byte limit since the size is only estimated.
+BATCH_WRITE_LIMIT = 500
+BATCH_WRITE_MAX_BYTES = 9 * 1024 * 1024
+
+# Reads retry only on transient gRPC errors, with a short exponential backoff;
+# anything else still falls through to the method's own error handling.
+READ_RETRY = api_retry.Retry(
+    predicate=api_retry.if_exception_type(DeadlineExceeded, ServiceUnavailable, Aborted),
+    initial=0.05,
+    maximum=1.0,
+    multiplier=2.0,
+    timeout=5.0,
+)
+
+# Per-attempt RPC deadlines, so a slow Firestore call cannot pin a webhook worker
+READ_TIMEOUT_SECONDS = float(os.getenv("FIRESTORE_READ_TIMEOUT_SECONDS", "3"))
+WRITE_TIMEOUT_SECONDS = float(os.getenv("FIRESTORE_WRITE_TIMEOUT_SECONDS", "10"))
+READ_OPTIONS = {"retry": READ_RETRY, "timeout": READ_TIMEOUT_SECONDS}
+
+# Page size for keyset-paginated scans over large result sets
+QUERY_PAGE_SIZE = 500
+
+
+@lru_cache(maxsize=None)
+def get_firestore_client(project_id: str) -> firestore.Client:
+    """Process-wide Firestore client per project, so every caller shares one gRPC channel pool."""
+    if os.getenv("FIRESTORE_EMULATOR_HOST"):
+        # Local/CI emulator: plaintext channel, no credential discovery
+        return firestore.Client(project=project_id, credentials=AnonymousCredentials())
+    return firestore.Client(project=project_id)
+
 
 class GendeiDatabase:
     """Firestore database operations for Gendei"""
     MAX_MESSAGES_PER_CONVERSATION = 250
 
     def __init__(self, project_id: Optional[str] = None):
-        """Initialize Firestore client"""
+        """Configure the database; the Firestore client is created on first use"""
+        self.project_id = project_id or os.getenv("GOOGLE_CLOUD_PROJECT") or os.getenv("GCP_PROJECT", "gendei-prod")
+        self._db: Optional[firestore.Client] = None
+        self._db_lock = threading.Lock()
+        self._read_cache: "OrderedDict[Tuple[str, str], Tuple[float, Any]]" = OrderedDict()
+        self._read_cache_lock = threading.Lock()
+        self._seen_messages: "OrderedDict[str, float]" = OrderedDict()
+        self._seen_messages_lock = threading.Lock()
+        # Called with a clinic_id after its clinic, professional or service docs change
+        self._clinic_change_listeners: List[Callable[[str], None]] = []
+
+    @property
+    def db(self) -> firestore.Client:
+        """Firestore client, created lazily to keep it off the startup path"""
+        if self._db is None:
+            with self._db_lock:
+                if self._db is None:
+                    try:
+                        self._db = get_firestore_client(self.project_id)
+                        logger.info(f"✅ Gendei Firestore connected to project: {self.project_id}")
+                    except Exception as e:
+                        logger.error(f"❌ Failed to initialize Firestore: {e}")
+                        raise
+        return self._db
+
+    # Top-level collection references, built once per instance
+    @cached_property
+    def _clinics(self) -> firestore.CollectionReference:
+        return self.db.collection(CLINICS)
+
+    @cached_property
+    def _appointments(self) -> firestore.CollectionReference:
+        return self.db.collection(APPOINTMENTS)
+
+    @cached_property
+    def _whatsapp(self) -> firestore.CollectionReference:
+        return self.db.collection(WHATSAPP)
+
+    @cached_property
+    def _tokens(self) -> firestore.CollectionReference:
+        return self.db.collection(TOKENS)
+
+    @cached_property
+    def _reminders(self) -> firestore.CollectionReference:
+        return self.db.collection("gendei_reminders")
+
+    @cached_property
+    def _processed_messages(self) -> firestore.CollectionReference:
+        return self.db.collection("gendei_processed_messages")
+
+    def _cache_get(self, kind: str, key: str) -> Any:
+        """Return a cached read, or _MISS if absent or expired."""
+        with self._read_cache_lock:
+            entry = self._read_cache.get((kind, key))
+            if entry is None:
+                return _MISS
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._read_cache[(kind, key)]
+                return _MISS
+            return value
+
+    def _cache_put(self, kind: str, key: str, value: Any) -> None:
+        if READ_CACHE_TTL_SECONDS <= 0:
+            return
+        with self._read_cache_lock:
+            self._read_cache[(kind, key)] = (time.monotonic() + READ_CACHE_TTL_SECONDS, value)
+            self._read_cache.move_to_end((kind, key))
+            while len(self._read_cache) > READ_CACHE_MAX_ENTRIES:
+                self._read_cache.popitem(last=False)
+
+    def invalidate_clinic_cache(self, clinic_id: str) -> None:
+        """Drop cached clinic, phone-number and token reads for a clinic."""
+        with self._read_cache_lock:
+            stale = [
+                cache_key for cache_key, (_, value) in self._read_cache.items()
+                if cache_key[1] == clinic_id or getattr(value, "id", None) == clinic_id
+            ]
+            for cache_key in stale:
+                del self._read_cache[cache_key]
+
+    def add_clinic_change_listener(self, listener: Callable[[str], None]) -> None:
+        """
+        Register a callback run after clinic, professional or service writes.
+        It may be called from worker threads, so it must be thread-safe.
+        """
+        self._clinic_change_listeners.append(listener)
+
+    def _notify_clinic_change(self, clinic_id: str) -> None:
+        """Tell registered listeners (e.g. the agents' context cache) a clinic changed."""
+        for listener in self._clinic_change_listeners:
+            try:
+                listener(clinic_id)
+            except Exception as e:
+                logger.warning(f"Clinic change listener failed for {clinic_id}: {e}")
+
+    def _commit_updates(self, updates: List[Tuple[Any, Dict[str, Any]]]) -> int:
+        """
+        Apply (document_ref, data) updates with as few WriteBatch commits as possible.
+        Returns the number of documents updated.
+        """
+        updated = 0
+        chunk: List[Tuple[Any, Dict[str, Any]]] = []
+        chunk_bytes = 0
+        for doc_ref, data in updates:
+            approx_bytes = len(doc_ref.path) + len(repr(data))
+            if chunk and (len(chunk) >= BATCH_WRITE_LIMIT or chunk_bytes + approx_bytes > BATCH_WRITE_MAX_BYTES):
+                updated += self._commit_chunk(chunk)
+                chunk = []
+                chunk_bytes = 0
+            chunk.append((doc_ref, data))
+            chunk_bytes += approx_bytes
+        if chunk:
+            updated += self._commit_chunk(chunk)
+        return updated
+
+    def _commit_chunk(self, chunk: List[Tuple[Any, Dict[str, Any]]]) -> int:
+        """
+        Commit one WriteBatch of updates. A batch is atomic, so if it fails
+        (e.g. one document was deleted) the updates are retried one by one
+        and only the failing documents are skipped.
+        """
+        batch = self.db.batch()
+        for doc_ref, data in chunk:
+            batch.update(doc_ref, data)
         try:
-            self.project_id = project_id or os.getenv("GOOGLE_CLOUD_PROJECT") or os.getenv("GCP_PROJECT", "gendei-prod")
-            self.db = firestore.Client(project=self.project_id)
-            logger.info(f"✅ Gendei Firestore connected to project: {self.project_id}")
+            batch.commit(timeout=WRITE_TIMEOUT_SECONDS)
+            return len(chunk)
         except Exception as e:
-            logger.error(f"❌ Failed to initialize Firestore: {e}")
-            raise
+            logger.warning(f"Batch commit of {len(chunk)} updates failed, retrying one by one: {e}")
+
+        updated = 0
+        for doc_ref, data in chunk:
+            try:
+                doc_ref.update(data, timeout=WRITE_TIMEOUT_SECONDS)
+                updated += 1
+            except Exception as e:
+                logger.error(f"Error updating {doc_ref.path}: {e}")
+        return updated
+
+    @staticmethod
+    def _paginate(query: Any, page_size: int = QUERY_PAGE_SIZE) -> Iterator[Any]:
+        """Stream a query page by page, resuming after the last document of each page."""
+        last_doc = None
+        while True:
+            page_query = query.limit(page_size)
+            if last_doc is not None:
+                page_query = page_query.start_after(last_doc)
+            count = 0
+            for doc in page_query.stream(**READ_OPTIONS):
+                count += 1
+                last_doc = doc
+                yield doc
+            if count < page_size:
+                return
+
+    @staticmethod
+    def _mask_with(fields: List[str], *order_fields: str) -> List[str]:
+        """Field mask that keeps the ordered fields, which start_after() reads from the last snapshot."""
+        return list(dict.fromkeys([*fields, *order_fields]))
+
+    @staticmethod
+    def _timestamp_age(value: Any) -> Optional[timedelta]:
+        """Age of a stored time: Firestore Timestamp or legacy local ISO string."""
+        if isinstance(value, str) and value:
+            try:
+                value = datetime.fromisoformat(value)
+            except ValueError:
+                return None
+        if not isinstance(value, datetime):
+            return None
+        return datetime.now(value.tzinfo) - value
 
     @staticmethod
     def _is_active(value: Any) -> bool:
@@ -76,7 +287,7 @@ class GendeiDatabase:
         services: List[Service] = []
 
         try:
-            docs = self.db.collection(CLINICS).document(clinic_id).collection("professionals").get()
+            docs = self._clinics.document(clinic_id).collection("professionals").get(**READ_OPTIONS)
         except Exception as e:
             logger.error(f"Error loading professionals for service fallback in clinic {clinic_id}: {e}")
             return services
@@ -156,39 +367,140 @@ class GendeiDatabase:
     # ============================================
 
     def get_clinic(self, clinic_id: str) -> Optional[Clinic]:
-        """Get clinic by ID"""
+        """Get clinic by ID (cached for READ_CACHE_TTL_SECONDS)"""
+        cached = self._cache_get("clinic", clinic_id)
+        if cached is not _MISS:
+            return cached
         try:
-            doc = self.db.collection(CLINICS).document(clinic_id).get()
+            doc = self._clinics.document(clinic_id).get(**READ_OPTIONS)
             if doc.exists:
                 data = doc.to_dict()
                 data["id"] = doc.id
-                return Clinic.from_dict(data)
+                clinic = Clinic.from_dict(data)
+                self._cache_put("clinic", clinic_id, clinic)
+                return clinic
             return None
         except Exception as e:
             logger.error(f"Error getting clinic {clinic_id}: {e}")
             return None
 
     def get_clinic_by_phone_number_id(self, phone_number_id: str) -> Optional[Clinic]:
-        """Get clinic by WhatsApp phone number ID"""
+        """Get clinic by WhatsApp phone number ID (cached for READ_CACHE_TTL_SECONDS)"""
+        cached = self._cache_get("clinic_by_phone", phone_number_id)
+        if cached is not _MISS:
+            return cached
         try:
-            docs = self.db.collection(CLINICS).where(
+            # Direct doc lookup through the phone_number_id -> clinicId map
+            connection_ref = self._whatsapp.document(phone_number_id)
+            connection = connection_ref.get(field_paths=["clinicId"], **READ_OPTIONS)
+            clinic_id = (connection.to_dict() or {}).get("clinicId") if connection.exists else None
+            if clinic_id:
+                clinic = self.get_clinic(clinic_id)
+                # Ignore a stale map entry if the number moved to another clinic
+                if clinic and clinic.whatsapp_phone_number_id == phone_number_id:
+                    self._cache_put("clinic_by_phone", phone_number_id, clinic)
+                    return clinic
+
+            docs = self._clinics.where(
                 "whatsappPhoneNumberId", "==", phone_number_id
-            ).limit(1).get()
+            ).limit(1).get(**READ_OPTIONS)
 
+            clinic = None
             for doc in docs:
                 data = doc.to_dict()
                 data["id"] = doc.id
-                return Clinic.from_dict(data)
-            return None
+                clinic = Clinic.from_dict(data)
+                self._cache_put("clinic_by_phone", phone_number_id, clinic)
+                self._cache_put("clinic", clinic.id, clinic)
+                break
+            if clinic is None:
+                return None
         except Exception as e:
             logger.error(f"Error getting clinic by phone number ID: {e}")
             return None
 
+        # Backfill the map so the next lookup skips the query; best effort
+        try:
+            connection_ref.set({"clinicId": clinic.id}, merge=True, timeout=WRITE_TIMEOUT_SECONDS)
+        except Exception as e:
+            logger.warning(f"Could not backfill WhatsApp map for {phone_number_id}: {e}")
+        return clinic
+
+    def get_clinics(self, clinic_ids: List[str]) -> Dict[str, Clinic]:
+        """Get several clinics by ID; cache misses are fetched in one get_all"""
+        clinics: Dict[str, Clinic] = {}
+        missing: List[str] = []
+        for clinic_id in dict.fromkeys(clinic_ids):
+            cached = self._cache_get("clinic", clinic_id)
+            if cached is _MISS:
+                missing.append(clinic_id)
+            else:
+                clinics[clinic_id] = cached
+        if not missing:
+            return clinics
+        try:
+            refs = [self._clinics.document(clinic_id) for clinic_id in missing]
+            for doc in self.db.get_all(refs, **READ_OPTIONS):
+                if not doc.exists:
+                    continue
+                clinic = Clinic.from_dict({**doc.to_dict(), "id": doc.id})
+                self._cache_put("clinic", doc.id, clinic)
+                clinics[doc.id] = clinic
+        except Exception as e:
+            logger.error(f"Error getting clinics {missing}: {e}")
+        return clinics
+
+    def get_clinic_bundle(
+        self,
+        clinic_id: str,
+        professional_ids: Optional[List[str]] = None
+    ) -> Tuple[Optional[Clinic], Dict[str, Professional]]:
+        """
+        Get a clinic and some of its professionals in one BatchGetDocuments RPC.
+        A clinic already in the read cache is served from it and left out of the RPC.
+
+        Returns:
+            (clinic, {professional_id: Professional}) - missing docs are omitted
+        """
+        cached = self._cache_get("clinic", clinic_id)
+        clinic: Optional[Clinic] = None if cached is _MISS else cached
+        professionals: Dict[str, Professional] = {}
+        try:
+            clinic_ref = self._clinics.document(clinic_id)
+            refs = [
+                clinic_ref.collection("professionals").document(professional_id)
+                for professional_id in dict.fromkeys(professional_ids or [])
+            ]
+            if cached is _MISS:
+                refs.insert(0, clinic_ref)
+            if not refs:
+                return clinic, professionals
+            for doc in self.db.get_all(refs, **READ_OPTIONS):
+                if not doc.exists:
+                    continue
+                data = doc.to_dict() or {}
+                data["id"] = doc.id
+                if doc.reference.parent.id == "professionals":
+                    data["clinicId"] = clinic_id
+                    professionals[doc.id] = Professional.from_dict(data)
+                else:
+                    clinic = Clinic.from_dict(data)
+                    self._cache_put("clinic", clinic_id, clinic)
+        except Exception as e:
+            logger.error(f"Error getting clinic bundle {clinic_id}: {e}")
+        return clinic, professionals
+
     def create_clinic(self, clinic: Clinic) -> str:
         """Create a new clinic"""
         try:
-            doc_ref = self.db.collection(CLINICS).document(clinic.id)
-            doc_ref.set(clinic.to_dict())
+            batch = self.db.batch()
+            batch.set(self._clinics.document(clinic.id), clinic.to_dict())
+            if clinic.whatsapp_phone_number_id:
+                # Keep the phone_number_id -> clinicId map in step
+                batch.set(self._whatsapp.document(clinic.whatsapp_phone_number_id), {"clinicId": clinic.id}, merge=True)
+            batch.commit(timeout=WRITE_TIMEOUT_SECONDS)
+            self.invalidate_clinic_cache(clinic.id)
+            self._notify_clinic_change(clinic.id)
             logger.info(f"✅ Clinic {clinic.id} created: {clinic.name}")
             return clinic.id
         except Exception as e:
@@ -199,7 +511,14 @@ class GendeiDatabase:
         """Update clinic fields"""
         try:
             data["updatedAt"] = datetime.now().isoformat()
-            self.db.collection(CLINICS).document(clinic_id).update(data)
+            batch = self.db.batch()
+            batch.update(self._clinics.document(clinic_id), data)
+            if data.get("whatsappPhoneNumberId"):
+                # Keep the phone_number_id -> clinicId map in step
+                batch.set(self._whatsapp.document(data["whatsappPhoneNumberId"]), {"clinicId": clinic_id}, merge=True)
+            batch.commit(timeout=WRITE_TIMEOUT_SECONDS)
+            self.invalidate_clinic_cache(clinic_id)
+            self._notify_clinic_change(clinic_id)
             logger.info(f"✅ Clinic {clinic_id} updated")
             return True
         except Exception as e:
@@ -213,23 +532,20 @@ class GendeiDatabase:
     def get_clinic_professionals(self, clinic_id: str) -> List[Professional]:
         """Get all professionals for a clinic"""
         try:
-            professionals_ref = self.db.collection(CLINICS).document(clinic_id).collection(
+            professionals_ref = self._clinics.document(clinic_id).collection(
                 "professionals"
             )
-            docs = professionals_ref.where("active", "==", True).get()
-
-            professionals = []
-            for doc in docs:
-                data = doc.to_dict()
-                data["id"] = doc.id
-                data["clinicId"] = clinic_id
-                professionals.append(Professional.from_dict(data))
+            from_dict = Professional.from_dict
+            professionals = [
+                from_dict({**doc.to_dict(), "id": doc.id, "clinicId": clinic_id})
+                for doc in professionals_ref.where("active", "==", True).stream(**READ_OPTIONS)
+            ]
 
             # Backward-compatible fallback:
             # some legacy docs may have missing/non-boolean `active` values, which
             # are excluded by Firestore equality query.
             if not professionals:
-                all_docs = professionals_ref.get()
+                all_docs = professionals_ref.stream(**READ_OPTIONS)
                 for doc in all_docs:
                     data = doc.to_dict() or {}
                     if not self._is_active(data.get("active", True)):
@@ -252,15 +568,19 @@ class GendeiDatabase:
             logger.error(f"Error getting professionals for clinic {clinic_id}: {e}")
             return []
 
-    def get_professional(self, clinic_id: str, professional_id: str) -> Optional[Professional]:
-        """Get a specific professional"""
+    def get_professional(
+        self, clinic_id: str, professional_id: str, active_only: bool = False
+    ) -> Optional[Professional]:
+        """Get a specific professional (active_only: treat inactive ones as missing)"""
         try:
-            doc = self.db.collection(CLINICS).document(clinic_id).collection(
+            doc = self._clinics.document(clinic_id).collection(
                 "professionals"
-            ).document(professional_id).get()
+            ).document(professional_id).get(**READ_OPTIONS)
 
             if doc.exists:
                 data = doc.to_dict()
+                if active_only and not self._is_active(data.get("active", True)):
+                    return None
                 data["id"] = doc.id
                 data["clinicId"] = clinic_id
                 return Professional.from_dict(data)
@@ -272,10 +592,11 @@ class GendeiDatabase:
     def create_professional(self, professional: Professional) -> str:
         """Create a new professional"""
         try:
-            doc_ref = self.db.collection(CLINICS).document(
+            doc_ref = self._clinics.document(
                 professional.clinic_id
             ).collection("professionals").document(professional.id)
-            doc_ref.set(professional.to_dict())
+            doc_ref.set(professional.to_dict(), timeout=WRITE_TIMEOUT_SECONDS)
+            self._notify_clinic_change(professional.clinic_id)
             logger.info(f"✅ Professional {professional.id} created: {professional.name}")
             return professional.id
         except Exception as e:
@@ -285,9 +606,10 @@ class GendeiDatabase:
     def update_professional(self, clinic_id: str, professional_id: str, data: Dict[str, Any]) -> bool:
         """Update professional fields"""
         try:
-            self.db.collection(CLINICS).document(clinic_id).collection(
+            self._clinics.document(clinic_id).collection(
                 "professionals"
-            ).document(professional_id).update(data)
+            ).document(professional_id).update(data, timeout=WRITE_TIMEOUT_SECONDS)
+            self._notify_clinic_change(clinic_id)
             logger.info(f"✅ Professional {professional_id} updated")
             return True
         except Exception as e:
@@ -301,19 +623,16 @@ class GendeiDatabase:
     def get_clinic_services(self, clinic_id: str) -> List[Service]:
         """Get all services for a clinic"""
         try:
-            services_ref = self.db.collection(CLINICS).document(clinic_id).collection("services")
-            docs = services_ref.where("active", "==", True).get()
-
-            services = []
-            for doc in docs:
-                data = doc.to_dict()
-                data["id"] = doc.id
-                data["clinicId"] = clinic_id
-                services.append(Service.from_dict(data))
+            services_ref = self._clinics.document(clinic_id).collection("services")
+            from_dict = Service.from_dict
+            services = [
+                from_dict({**doc.to_dict(), "id": doc.id, "clinicId": clinic_id})
+                for doc in services_ref.where("active", "==", True).stream(**READ_OPTIONS)
+            ]
 
             # Backward-compatible fallback for legacy `active` values in services docs.
             if not services:
-                all_docs = services_ref.get()
+                all_docs = services_ref.stream(**READ_OPTIONS)
                 for doc in all_docs:
                     data = doc.to_dict() or {}
                     if not self._is_active(data.get("active", True)):
@@ -348,9 +667,9 @@ class GendeiDatabase:
     def get_service(self, clinic_id: str, service_id: str) -> Optional[Service]:
         """Get a specific service"""
         try:
-            doc = self.db.collection(CLINICS).document(clinic_id).collection(
+            doc = self._clinics.document(clinic_id).collection(
                 "services"
-            ).document(service_id).get()
+            ).document(service_id).get(**READ_OPTIONS)
 
             if doc.exists:
                 data = doc.to_dict()
@@ -365,10 +684,11 @@ class GendeiDatabase:
     def create_service(self, service: Service) -> str:
         """Create a new service"""
         try:
-            doc_ref = self.db.collection(CLINICS).document(
+            doc_ref = self._clinics.document(
                 service.clinic_id
             ).collection("services").document(service.id)
-            doc_ref.set(service.to_dict())
+            doc_ref.set(service.to_dict(), timeout=WRITE_TIMEOUT_SECONDS)
+            self._notify_clinic_change(service.clinic_id)
             logger.info(f"✅ Service {service.id} created: {service.name}")
             return service.id
         except Exception as e:
@@ -384,11 +704,14 @@ class GendeiDatabase:
         """Create a new appointment under the clinic subcollection"""
         try:
             # Save to clinics/{clinicId}/appointments/{appointmentId}
-            doc_ref = self.db.collection(CLINICS).document(appointment.clinic_id).collection(
+            doc_ref = self._clinics.document(appointment.clinic_id).collection(
                 "appointments"
             ).document(appointment.id)
-            doc_ref.set(appointment.to_dict())
-            logger.info(f"✅ Appointment {appointment.id} created for {appointment.patient_name} in clinic {appointment.clinic_id}")
+            doc_ref.set(appointment.to_dict(), timeout=WRITE_TIMEOUT_SECONDS)
+            logger.info(
+                "✅ Appointment %s created for %s in clinic %s",
+                appointment.id, appointment.patient_name, appointment.clinic_id,
+            )
             return appointment.id
         except Exception as e:
             logger.error(f"Error creating appointment: {e}")
@@ -399,9 +722,9 @@ class GendeiDatabase:
         try:
             if clinic_id:
                 # Direct lookup with known clinic_id
-                doc = self.db.collection(CLINICS).document(clinic_id).collection(
+                doc = self._clinics.document(clinic_id).collection(
                     "appointments"
-                ).document(appointment_id).get()
+                ).document(appointment_id).get(**READ_OPTIONS)
                 if doc.exists:
                     data = doc.to_dict()
                     data["id"] = doc.id
@@ -411,7 +734,7 @@ class GendeiDatabase:
                 # Search using collection group query (across all clinics)
                 docs = self.db.collection_group("appointments").where(
                     "id", "==", appointment_id
-                ).limit(1).get()
+                ).limit(1).get(**READ_OPTIONS)
                 for doc in docs:
                     data = doc.to_dict()
                     data["id"] = doc.id
@@ -428,21 +751,21 @@ class GendeiDatabase:
 
             if clinic_id:
                 # Direct update with known clinic_id
-                self.db.collection(CLINICS).document(clinic_id).collection(
+                self._clinics.document(clinic_id).collection(
                     "appointments"
-                ).document(appointment_id).update(data)
+                ).document(appointment_id).update(data, timeout=WRITE_TIMEOUT_SECONDS)
             else:
                 # Find the appointment first to get clinic_id
                 appointment = self.get_appointment(appointment_id)
                 if appointment:
-                    self.db.collection(CLINICS).document(appointment.clinic_id).collection(
+                    self._clinics.document(appointment.clinic_id).collection(
                         "appointments"
-                    ).document(appointment_id).update(data)
+                    ).document(appointment_id).update(data, timeout=WRITE_TIMEOUT_SECONDS)
                 else:
                     logger.error(f"Appointment {appointment_id} not found for update")
                     return False
 
-            logger.info(f"✅ Appointment {appointment_id} updated")
+            logger.debug("✅ Appointment %s updated", appointment_id)
             return True
         except Exception as e:
             logger.error(f"Error updating appointment: {e}")
@@ -453,31 +776,29 @@ class GendeiDatabase:
         clinic_id: str,
         start_date: Optional[str] = None,
         end_date: Optional[str] = None,
-        professional_id: Optional[str] = None
+        professional_id: Optional[str] = None,
+        fields: Optional[List[str]] = None
     ) -> List[Appointment]:
-        """Get appointments for a clinic with optional filters"""
+        """Get appointments for a clinic with optional filters (fields: optional field mask)"""
         try:
-            # Query from clinics/{clinicId}/appointments subcollection
-            query = self.db.collection(CLINICS).document(clinic_id).collection("appointments")
-
-            docs = query.get()
-
-            appointments = []
-            for doc in docs:
-                data = doc.to_dict()
-                data["id"] = doc.id
-
-                # Apply filters in memory (to avoid complex Firestore index requirements)
-                if start_date and data.get("date", "") < start_date:
-                    continue
-                if end_date and data.get("date", "") > end_date:
-                    continue
-                if professional_id and data.get("professionalId") != professional_id:
-                    continue
-
-                appointments.append(Appointment.from_dict(data))
-
-            return appointments
+            # Query from clinics/{clinicId}/appointments subcollection.
+            # professionalId + date range is covered by a composite index.
+            query = self._clinics.document(clinic_id).collection("appointments")
+            if professional_id:
+                query = query.where("professionalId", "==", professional_id)
+            if start_date:
+                query = query.where("date", ">=", start_date)
+            if end_date:
+                query = query.where("date", "<=", end_date)
+            if start_date or end_date:
+                query = query.order_by("date")
+                if fields:
+                    fields = self._mask_with(fields, "date")
+            if fields:
+                query = query.select(fields)
+
+            from_dict = Appointment.from_dict
+            return [from_dict({**doc.to_dict(), "id": doc.id}) for doc in self._paginate(query)]
         except Exception as e:
             logger.error(f"Error getting clinic appointments: {e}")
             return []
@@ -489,31 +810,67 @@ class GendeiDatabase:
         end_date: str
     ) -> List[Appointment]:
         """Get appointments in a date range (for availability checking)"""
-        return self.get_clinic_appointments(
-            clinic_id=clinic_id,
-            start_date=start_date,
-            end_date=end_date
-        )
+        try:
+            # Fixed shape: date range on the clinic subcollection (single-field index)
+            query = self._clinics.document(clinic_id).collection("appointments").where(
+                "date", ">=", start_date
+            ).where("date", "<=", end_date).order_by("date")
+
+            from_dict = Appointment.from_dict
+            return [from_dict({**doc.to_dict(), "id": doc.id}) for doc in self._paginate(query)]
+        except Exception as e:
+            logger.error(f"Error getting appointments in range: {e}")
+            return []
+
+    def get_appointments_at_slot(
+        self,
+        clinic_id: str,
+        professional_id: str,
+        date_str: str,
+        time_str: str
+    ) -> List[Appointment]:
+        """Get appointments occupying one professional slot (for booking validation)"""
+        try:
+            # Equality-only filters are served by single-field indexes
+            docs = self._clinics.document(clinic_id).collection(
+                "appointments"
+            ).where("date", "==", date_str).where(
+                "time", "==", time_str
+            ).where("professionalId", "==", professional_id).stream(**READ_OPTIONS)
+
+            from_dict = Appointment.from_dict
+            return [from_dict({**doc.to_dict(), "id": doc.id}) for doc in docs]
+        except Exception as e:
+            logger.error(f"Error getting appointments at slot: {e}")
+            return []
+
+    def iter_all_appointments_in_range(
+        self,
+        start_date: str,
+        end_date: str,
+        fields: Optional[List[str]] = None
+    ) -> Iterator[Appointment]:
+        """Stream all appointments in a date range across clinics, one page at a time"""
+        # Use collection group query to get appointments from all clinics
+        query = self.db.collection_group("appointments").where(
+            "date", ">=", start_date
+        ).where("date", "<=", end_date).order_by("date")
+        if fields:
+            query = query.select(self._mask_with(fields, "date"))
+
+        from_dict = Appointment.from_dict
+        for doc in self._paginate(query):
+            yield from_dict({**doc.to_dict(), "id": doc.id})
 
     def get_all_appointments_in_range(
         self,
         start_date: str,
-        end_date: str
+        end_date: str,
+        fields: Optional[List[str]] = None
     ) -> List[Appointment]:
         """Get all appointments in a date range (for reminders) using collection group"""
         try:
-            # Use collection group query to get appointments from all clinics
-            docs = self.db.collection_group("appointments").where(
-                "date", ">=", start_date
-            ).where("date", "<=", end_date).get()
-
-            appointments = []
-            for doc in docs:
-                data = doc.to_dict()
-                data["id"] = doc.id
-                appointments.append(Appointment.from_dict(data))
-
-            return appointments
+            return list(self.iter_all_appointments_in_range(start_date, end_date, fields))
         except Exception as e:
             logger.error(f"Error getting all appointments in range: {e}")
             return []
@@ -527,22 +884,17 @@ class GendeiDatabase:
         try:
             if clinic_id:
                 # Query specific clinic's appointments
-                docs = self.db.collection(CLINICS).document(clinic_id).collection(
+                docs = self._clinics.document(clinic_id).collection(
                     "appointments"
-                ).where("patientId", "==", patient_id).get()
+                ).where("patientId", "==", patient_id).stream(**READ_OPTIONS)
             else:
                 # Query all clinics using collection group
                 docs = self.db.collection_group("appointments").where(
                     "patientId", "==", patient_id
-                ).get()
+                ).stream(**READ_OPTIONS)
 
-            appointments = []
-            for doc in docs:
-                data = doc.to_dict()
-                data["id"] = doc.id
-                appointments.append(Appointment.from_dict(data))
-
-            return appointments
+            from_dict = Appointment.from_dict
+            return [from_dict({**doc.to_dict(), "id": doc.id}) for doc in docs]
         except Exception as e:
             logger.error(f"Error getting patient appointments: {e}")
             return []
@@ -557,9 +909,9 @@ class GendeiDatabase:
         try:
             if clinic_id:
                 # Direct lookup
-                doc = self.db.collection(CLINICS).document(clinic_id).collection(
+                doc = self._clinics.document(clinic_id).collection(
                     "patients"
-                ).document(patient_id).get()
+                ).document(patient_id).get(**READ_OPTIONS)
                 if doc.exists:
                     data = doc.to_dict()
                     data["id"] = doc.id
@@ -569,7 +921,7 @@ class GendeiDatabase:
                 # Search across all clinics using collection group
                 docs = self.db.collection_group("patients").where(
                     "id", "==", patient_id
-                ).limit(1).get()
+                ).limit(1).get(**READ_OPTIONS)
                 for doc in docs:
                     data = doc.to_dict()
                     data["id"] = doc.id
@@ -588,13 +940,15 @@ class GendeiDatabase:
 
             clinic_id = patient.clinic_ids[0]  # Primary clinic
 
-            doc_ref = self.db.collection(CLINICS).document(clinic_id).collection(
+            doc_ref = self._clinics.document(clinic_id).collection(
                 "patients"
             ).document(patient.id)
-            existing = doc_ref.get()
 
-            if existing.exists:
-                # Update only if data changed
+            try:
+                # Create new patient (fails if the document already exists)
+                doc_ref.create(patient.to_dict(), timeout=WRITE_TIMEOUT_SECONDS)
+            except AlreadyExists:
+                # Merge non-empty fields; ArrayUnion dedups clinicIds server-side
                 update_data = {
                     "name": patient.name,
                     "updatedAt": datetime.now().isoformat()
@@ -609,19 +963,9 @@ class GendeiDatabase:
                     update_data["convenioName"] = patient.convenio_name
                 if patient.convenio_number:
                     update_data["convenioNumber"] = patient.convenio_number
+                update_data["clinicIds"] = firestore.ArrayUnion(list(patient.clinic_ids))
 
-                # Add clinic to list if not present
-                existing_data = existing.to_dict()
-                clinic_ids = existing_data.get("clinicIds", [])
-                for cid in patient.clinic_ids:
-                    if cid not in clinic_ids:
-                        clinic_ids.append(cid)
-                update_data["clinicIds"] = clinic_ids
-
-                doc_ref.update(update_data)
-            else:
-                # Create new patient
-                doc_ref.set(patient.to_dict())
+                doc_ref.set(update_data, merge=True, timeout=WRITE_TIMEOUT_SECONDS)
 
             logger.info(f"✅ Patient {patient.id} upserted in clinic {clinic_id}: {patient.name}")
             return patient.id
@@ -636,7 +980,7 @@ class GendeiDatabase:
     def get_whatsapp_connection(self, phone_number_id: str) -> Optional[Dict[str, Any]]:
         """Get WhatsApp connection by phone number ID"""
         try:
-            doc = self.db.collection(WHATSAPP).document(phone_number_id).get()
+            doc = self._whatsapp.document(phone_number_id).get(**READ_OPTIONS)
             if doc.exists:
                 data = doc.to_dict()
                 data["id"] = doc.id
@@ -646,17 +990,76 @@ class GendeiDatabase:
             logger.error(f"Error getting WhatsApp connection: {e}")
             return None
 
-    def save_whatsapp_connection(self, phone_number_id: str, data: Dict[str, Any]) -> bool:
-        """Save WhatsApp connection"""
+    def save_whatsapp_connection(
+        self,
+        phone_number_id: str,
+        data: Dict[str, Any],
+        clinic_id: Optional[str] = None
+    ) -> bool:
+        """Save WhatsApp connection (clinicId doubles as the phone_number_id -> clinic map)"""
         try:
+            if clinic_id:
+                data["clinicId"] = clinic_id
             data["updatedAt"] = datetime.now().isoformat()
-            self.db.collection(WHATSAPP).document(phone_number_id).set(data, merge=True)
+            self._whatsapp.document(phone_number_id).set(data, merge=True, timeout=WRITE_TIMEOUT_SECONDS)
             logger.info(f"✅ WhatsApp connection {phone_number_id} saved")
             return True
         except Exception as e:
             logger.error(f"Error saving WhatsApp connection: {e}")
             return False
 
+    def resolve_webhook_context(self, phone_number_id: str) -> Tuple[Optional[Clinic], Optional[str]]:
+        """
+        Resolve the clinic and access token for an incoming webhook.
+        Uses the WhatsApp connection doc as a phone_number_id -> clinicId map so
+        the clinic and token docs come back in one get_all; falls back to the
+        whatsappPhoneNumberId query (and backfills the map) when it is missing.
+        """
+        cached = self._cache_get("clinic_by_phone", phone_number_id)
+        if cached is not _MISS:
+            return cached, self.get_access_token(cached.id)
+
+        try:
+            connection_ref = self._whatsapp.document(phone_number_id)
+            connection = connection_ref.get(**READ_OPTIONS)
+            clinic_id = (connection.to_dict() or {}).get("clinicId") if connection.exists else None
+            if not clinic_id:
+                # Query fallback; get_clinic_by_phone_number_id backfills the map
+                clinic = self.get_clinic_by_phone_number_id(phone_number_id)
+                return clinic, self.get_access_token(clinic.id) if clinic else None
+
+            clinic_ref = self._clinics.document(clinic_id)
+            token_ref = self._tokens.document(clinic_id)
+            snapshots = {
+                doc.reference.path: doc
+                for doc in self.db.get_all([clinic_ref, token_ref], **READ_OPTIONS)
+            }
+            clinic_doc = snapshots[clinic_ref.path]
+            clinic_data = clinic_doc.to_dict() if clinic_doc.exists else None
+            if not clinic_data or clinic_data.get("whatsappPhoneNumberId") != phone_number_id:
+                # Stale map entry: resolve through the query and re-backfill
+                clinic = self.get_clinic_by_phone_number_id(phone_number_id)
+                return clinic, self.get_access_token(clinic.id) if clinic else None
+
+            clinic_data["id"] = clinic_doc.id
+            clinic = Clinic.from_dict(clinic_data)
+            self._cache_put("clinic", clinic_id, clinic)
+            self._cache_put("clinic_by_phone", phone_number_id, clinic)
+
+            # Same priority as get_access_token: system token, clinic doc, tokens collection
+            bisu_token = os.getenv("META_BISU_ACCESS_TOKEN") or os.getenv("WHATSAPP_TOKEN")
+            if bisu_token:
+                return clinic, bisu_token
+            token_doc = snapshots[token_ref.path]
+            token_data = token_doc.to_dict() if token_doc.exists else {}
+            access_token = clinic_data.get("whatsappAccessToken") or (token_data or {}).get("accessToken")
+            if access_token:
+                self._cache_put("token", clinic_id, access_token)
+            return clinic, access_token
+        except Exception as e:
+            logger.error(f"Error resolving webhook context for {phone_number_id}: {e}")
+            return None, None
+
     # ============================================
     # ORDER OPERATIONS
     # Now uses nested path: clinics/{clinicId}/orders/{orderId}
@@ -672,9 +1075,9 @@ class GendeiDatabase:
             if not cid:
                 raise ValueError("Order must have a clinicId")
 
-            self.db.collection(CLINICS).document(cid).collection(
+            self._clinics.document(cid).collection(
                 "orders"
-            ).document(order_id).set(data)
+            ).document(order_id).set(data, timeout=WRITE_TIMEOUT_SECONDS)
             logger.info(f"✅ Order {order_id} created in clinic {cid}")
             return order_id
         except Exception as e:
@@ -686,9 +1089,9 @@ class GendeiDatabase:
         try:
             if clinic_id:
                 # Direct lookup
-                doc = self.db.collection(CLINICS).document(clinic_id).collection(
+                doc = self._clinics.document(clinic_id).collection(
                     "orders"
-                ).document(order_id).get()
+                ).document(order_id).get(**READ_OPTIONS)
                 if doc.exists:
                     data = doc.to_dict()
                     data["id"] = doc.id
@@ -698,7 +1101,7 @@ class GendeiDatabase:
                 # Search across all clinics using collection group
                 docs = self.db.collection_group("orders").where(
                     "id", "==", order_id
-                ).limit(1).get()
+                ).limit(1).get(**READ_OPTIONS)
                 for doc in docs:
                     data = doc.to_dict()
                     data["id"] = doc.id
@@ -715,16 +1118,16 @@ class GendeiDatabase:
 
             if clinic_id:
                 # Direct update
-                self.db.collection(CLINICS).document(clinic_id).collection(
+                self._clinics.document(clinic_id).collection(
                     "orders"
-                ).document(order_id).update(data)
+                ).document(order_id).update(data, timeout=WRITE_TIMEOUT_SECONDS)
             else:
                 # Find order first to get clinic_id
                 order = self.get_order(order_id)
                 if order and order.get("clinicId"):
-                    self.db.collection(CLINICS).document(order["clinicId"]).collection(
+                    self._clinics.document(order["clinicId"]).collection(
                         "orders"
-                    ).document(order_id).update(data)
+                    ).document(order_id).update(data, timeout=WRITE_TIMEOUT_SECONDS)
                 else:
                     logger.error(f"Order {order_id} not found for update")
                     return False
@@ -742,7 +1145,8 @@ class GendeiDatabase:
         """Save encrypted access token"""
         try:
             token_data["updatedAt"] = datetime.now().isoformat()
-            self.db.collection(TOKENS).document(clinic_id).set(token_data, merge=True)
+            self._tokens.document(clinic_id).set(token_data, merge=True, timeout=WRITE_TIMEOUT_SECONDS)
+            self.invalidate_clinic_cache(clinic_id)
             return True
         except Exception as e:
             logger.error(f"Error saving access token: {e}")
@@ -756,26 +1160,45 @@ class GendeiDatabase:
             # Check both META_BISU_ACCESS_TOKEN and WHATSAPP_TOKEN for backward compatibility
             bisu_token = os.getenv("META_BISU_ACCESS_TOKEN") or os.getenv("WHATSAPP_TOKEN")
             if bisu_token:
-                logger.info(f"✅ Using system token from environment for {clinic_id}")
+                logger.debug("✅ Using system token from environment for %s", clinic_id)
                 return bisu_token
 
-            # 2. Fall back to whatsappAccessToken in clinic document
+            cached = self._cache_get("token", clinic_id)
+            if cached is not _MISS:
+                return cached
+
+            # 2/3. Fallbacks: the clinic doc and the tokens collection, fetched
+            # together in one get_all and picked by precedence below
+            clinic_ref = self._clinics.document(clinic_id)
+            token_ref = self._tokens.document(clinic_id)
+            snapshots = {
+                doc.reference.path: doc
+                for doc in self.db.get_all(
+                    [clinic_ref, token_ref],
+                    field_paths=["whatsappAccessToken", "accessToken"],
+                    **READ_OPTIONS,
+                )
+            }
+
+            # 2. whatsappAccessToken in clinic document
             # This is the user OAuth token from Embedded Signup (may be short-lived)
-            clinic_doc = self.db.collection(CLINICS).document(clinic_id).get()
+            clinic_doc = snapshots[clinic_ref.path]
             if clinic_doc.exists:
-                clinic_data = clinic_doc.to_dict()
+                clinic_data = clinic_doc.to_dict() or {}
                 clinic_token = clinic_data.get("whatsappAccessToken")
                 if clinic_token:
                     logger.info(f"⚠️ Using whatsappAccessToken from clinic doc for {clinic_id} (fallback)")
+                    self._cache_put("token", clinic_id, clinic_token)
                     return clinic_token
 
-            # 3. Fall back to tokens collection
-            token_doc = self.db.collection(TOKENS).document(clinic_id).get()
+            # 3. accessToken in tokens collection
+            token_doc = snapshots[token_ref.path]
             if token_doc.exists:
-                token_data = token_doc.to_dict()
+                token_data = token_doc.to_dict() or {}
                 stored_token = token_data.get("accessToken")
                 if stored_token:
                     logger.info(f"⚠️ Using accessToken from tokens collection for {clinic_id} (fallback)")
+                    self._cache_put("token", clinic_id, stored_token)
                     return stored_token
 
             logger.warning(f"❌ No access token found for clinic {clinic_id}")
@@ -804,16 +1227,23 @@ class GendeiDatabase:
     ) -> bool:
         """Log a conversation message using single-doc chat history format."""
         try:
-            conv_ref = self.db.collection(CLINICS).document(clinic_id).collection(
+            conv_ref = self._clinics.document(clinic_id).collection(
                 "conversations"
             ).document(phone)
             chat_history_ref = conv_ref.collection("messages").document("chat_history")
 
+            # Both docs in one BatchGetDocuments RPC; all writes go in one commit
+            snapshots = {
+                doc.reference.path: doc
+                for doc in self.db.get_all([conv_ref, chat_history_ref], **READ_OPTIONS)
+            }
+            conv_doc = snapshots[conv_ref.path]
+            existing_doc = snapshots[chat_history_ref.path]
+            batch = self.db.batch()
+
             # Create conversation doc if not exists
-            conv_doc = conv_ref.get()
             if not conv_doc.exists:
-                now = datetime.now().isoformat()
-                conv_ref.set({
+                batch.set(conv_ref, {
                     "id": phone,
                     "clinicId": clinic_id,
                     "phone": phone,
@@ -821,12 +1251,12 @@ class GendeiDatabase:
                     "waUserPhone": phone,
                     "state": "novo",
                     "lastMessage": content[:100],
-                    "messageCount": 0,
+                    "messageCount": 1,
                     "isHumanTakeover": False,
                     "aiPaused": False,
-                    "createdAt": now,
-                    "updatedAt": now,
-                    "lastMessageAt": now
+                    "createdAt": firestore.SERVER_TIMESTAMP,
+                    "updatedAt": firestore.SERVER_TIMESTAMP,
+                    "lastMessageAt": firestore.SERVER_TIMESTAMP
                 })
 
             # Determine direction based on source
@@ -852,12 +1282,11 @@ class GendeiDatabase:
             if metadata:
                 msg_data["metadata"] = metadata
 
-            existing_doc = chat_history_ref.get()
             if not existing_doc.exists:
                 # One-time bootstrap: migrate legacy per-message docs into chat_history.
                 legacy_docs = conv_ref.collection("messages").order_by(
                     "timestamp", direction=firestore.Query.DESCENDING
-                ).limit(self.MAX_MESSAGES_PER_CONVERSATION - 1).get()
+                ).limit(self.MAX_MESSAGES_PER_CONVERSATION - 1).stream(**READ_OPTIONS)
 
                 messages_map: Dict[str, Dict[str, Any]] = {}
                 for legacy_doc in reversed(list(legacy_docs)):
@@ -878,7 +1307,7 @@ class GendeiDatabase:
                 trimmed_entries = sorted_entries[-self.MAX_MESSAGES_PER_CONVERSATION:]
                 trimmed_map = dict(trimmed_entries)
 
-                chat_history_ref.set({
+                batch.set(chat_history_ref, {
                     "messages": trimmed_map,
                     "lastUpdated": timestamp_iso,
                     "messageCount": len(trimmed_map),
@@ -886,7 +1315,8 @@ class GendeiDatabase:
                     "waUserId": phone,
                 })
             else:
-                existing_count = int(existing_doc.to_dict().get("messageCount", 0))
+                existing_data = existing_doc.to_dict()
+                existing_count = int(existing_data.get("messageCount", 0))
                 next_count = existing_count + 1
                 trim_count = max(next_count - self.MAX_MESSAGES_PER_CONVERSATION, 0)
 
@@ -899,24 +1329,25 @@ class GendeiDatabase:
                 }
 
                 if trim_count > 0:
-                    messages_map = existing_doc.to_dict().get("messages", {})
+                    messages_map = existing_data.get("messages", {})
                     sorted_keys = sorted(messages_map.keys())
                     keys_to_remove = sorted_keys[:trim_count]
                     for key in keys_to_remove:
                         history_updates[f"messages.{key}"] = firestore.DELETE_FIELD
 
-                chat_history_ref.set(history_updates, merge=True)
+                batch.set(chat_history_ref, history_updates, merge=True)
 
-            # Update conversation last message
-            now_iso = datetime.now().isoformat()
-            conv_ref.update({
-                "lastMessage": content[:100],
-                "updatedAt": now_iso,
-                "lastMessageAt": now_iso,
-                "messageCount": firestore.Increment(1)
-            })
+            # Update conversation last message (a new conversation already has it)
+            if conv_doc.exists:
+                batch.update(conv_ref, {
+                    "lastMessage": content[:100],
+                    "updatedAt": firestore.SERVER_TIMESTAMP,
+                    "lastMessageAt": firestore.SERVER_TIMESTAMP,
+                    "messageCount": firestore.Increment(1)
+                })
+            batch.commit(timeout=WRITE_TIMEOUT_SECONDS)
 
-            logger.debug(f"📝 Logged {direction} message for {phone}")
+            logger.debug("📝 Logged %s message for %s", direction, phone)
             return True
         except Exception as e:
             logger.error(f"Error logging conversation message: {e}")
@@ -930,12 +1361,12 @@ class GendeiDatabase:
     ) -> List[Dict[str, Any]]:
         """Get conversation history for a phone number."""
         try:
-            conv_ref = self.db.collection(CLINICS).document(clinic_id).collection(
+            conv_ref = self._clinics.document(clinic_id).collection(
                 "conversations"
             ).document(phone)
 
             # New format: single chat_history document.
-            chat_history_doc = conv_ref.collection("messages").document("chat_history").get()
+            chat_history_doc = conv_ref.collection("messages").document("chat_history").get(**READ_OPTIONS)
             if chat_history_doc.exists:
                 data = chat_history_doc.to_dict() or {}
                 messages_map = data.get("messages", {})
@@ -953,7 +1384,7 @@ class GendeiDatabase:
             # Legacy fallback: one document per message in subcollection.
             messages = conv_ref.collection("messages").order_by(
                 "timestamp", direction=firestore.Query.DESCENDING
-            ).limit(limit).get()
+            ).limit(limit).stream(**READ_OPTIONS)
 
             legacy_result = []
             for msg in messages:
@@ -974,25 +1405,35 @@ class GendeiDatabase:
     def create_reminder(self, data: Dict[str, Any]) -> str:
         """Create a reminder record"""
         try:
-            doc_ref = self.db.collection("gendei_reminders").add(data)
+            doc_ref = self._reminders.add(data, timeout=WRITE_TIMEOUT_SECONDS)
             return doc_ref[1].id
         except Exception as e:
             logger.error(f"Error creating reminder: {e}")
             raise
 
-    def get_pending_reminders(self, clinic_id: Optional[str] = None) -> List[Dict[str, Any]]:
-        """Get pending reminders"""
+    def iter_pending_reminders(
+        self,
+        clinic_id: Optional[str] = None,
+        fields: Optional[List[str]] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """Stream pending reminders page by page, in document-id order"""
+        query = self._reminders.where("sent", "==", False)
+        if clinic_id:
+            query = query.where("clinicId", "==", clinic_id)
+        if fields:
+            query = query.select(fields)
+
+        for doc in self._paginate(query):
+            yield {**doc.to_dict(), "id": doc.id}
+
+    def get_pending_reminders(
+        self,
+        clinic_id: Optional[str] = None,
+        fields: Optional[List[str]] = None
+    ) -> List[Dict[str, Any]]:
+        """Get pending reminders (fields: optional field mask)"""
         try:
-            query = self.db.collection("gendei_reminders").where("sent", "==", False)
-
-            docs = query.get()
-            reminders = []
-            for doc in docs:
-                data = doc.to_dict()
-                data["id"] = doc.id
-                reminders.append(data)
-
-            return reminders
+            return list(self.iter_pending_reminders(clinic_id, fields))
         except Exception as e:
             logger.error(f"Error getting pending reminders: {e}")
             return []
@@ -1000,15 +1441,34 @@ class GendeiDatabase:
     def mark_reminder_sent(self, reminder_id: str) -> bool:
         """Mark a reminder as sent"""
         try:
-            self.db.collection("gendei_reminders").document(reminder_id).update({
+            self._reminders.document(reminder_id).update({
                 "sent": True,
                 "sentAt": datetime.now().isoformat()
-            })
+            }, timeout=WRITE_TIMEOUT_SECONDS)
             return True
         except Exception as e:
             logger.error(f"Error marking reminder sent: {e}")
             return False
 
+    def update_reminder_appointments(self, updates: List[Tuple[str, Dict[str, Any]]]) -> int:
+        """
+        Apply (appointment_id, data) updates in batched commits to the
+        appointment documents get_appointments_needing_reminder reads.
+        Returns how many appointments were updated.
+        """
+        if not updates:
+            return 0
+        try:
+            updated_at = datetime.now().isoformat()
+            appointments = self._appointments
+            return self._commit_updates([
+                (appointments.document(appointment_id), {**data, "updatedAt": updated_at})
+                for appointment_id, data in updates
+            ])
+        except Exception as e:
+            logger.error(f"Error batch updating appointments: {e}")
+            return 0
+
     # ============================================
     # CONTACT MANAGEMENT (Like Zapcomm)
     # ============================================
@@ -1035,31 +1495,27 @@ class GendeiDatabase:
         try:
             # Use phone number as document ID
             contact_id = phone.replace(' ', '')
-            contact_ref = self.db.collection(CLINICS).document(clinic_id).collection(
+            contact_ref = self._clinics.document(clinic_id).collection(
                 "contacts"
             ).document(contact_id)
 
-            doc = contact_ref.get()
             now = datetime.now().isoformat()
 
-            if doc.exists:
-                # Update existing contact
-                updates = {
-                    "updatedAt": now,
-                    "lastMessageAt": now,
-                }
-                if name:
-                    updates["name"] = name
-                if profile_picture_url:
-                    updates["profilePictureUrl"] = profile_picture_url
-
-                # Increment message count
-                current_data = doc.to_dict()
-                updates["messageCount"] = current_data.get("messageCount", 0) + 1
+            # Update existing contact (no read; the count is incremented server-side)
+            updates = {
+                "updatedAt": now,
+                "lastMessageAt": now,
+                "messageCount": firestore.Increment(1),
+            }
+            if name:
+                updates["name"] = name
+            if profile_picture_url:
+                updates["profilePictureUrl"] = profile_picture_url
 
-                contact_ref.update(updates)
-                logger.debug(f"👤 Updated contact {contact_id}: {name}")
-            else:
+            try:
+                contact_ref.update(updates, timeout=WRITE_TIMEOUT_SECONDS)
+                logger.debug("👤 Updated contact %s: %s", contact_id, name)
+            except NotFound:
                 # Create new contact
                 contact_data = {
                     "id": contact_id,
@@ -1075,8 +1531,12 @@ class GendeiDatabase:
                     "updatedAt": now,
                     "lastMessageAt": now,
                 }
-                contact_ref.set(contact_data)
-                logger.info(f"👤 Created new contact {contact_id}: {name}")
+                try:
+                    contact_ref.create(contact_data, timeout=WRITE_TIMEOUT_SECONDS)
+                    logger.info(f"👤 Created new contact {contact_id}: {name}")
+                except AlreadyExists:
+                    # Created concurrently; count this message on top of it
+                    contact_ref.update(updates, timeout=WRITE_TIMEOUT_SECONDS)
 
             return contact_id
 
@@ -1095,10 +1555,10 @@ class GendeiDatabase:
         """
         try:
             contact_id = phone.replace(' ', '')
-            contact_ref = self.db.collection(CLINICS).document(clinic_id).collection(
+            contact_ref = self._clinics.document(clinic_id).collection(
                 "contacts"
             ).document(contact_id)
-            doc = contact_ref.get()
+            doc = contact_ref.get(**READ_OPTIONS)
 
             if doc.exists:
                 contact = doc.to_dict()
@@ -1122,13 +1582,13 @@ class GendeiDatabase:
         Also checks 'aiPaused' for additional safety.
         """
         try:
-            conv_ref = self.db.collection(CLINICS).document(clinic_id).collection(
+            conv_ref = self._clinics.document(clinic_id).collection(
                 "conversations"
             ).document(phone)
-            doc = conv_ref.get()
+            doc = conv_ref.get(field_paths=["isHumanTakeover", "humanTakeover", "aiPaused"], **READ_OPTIONS)
 
             if doc.exists:
-                data = doc.to_dict()
+                data = doc.to_dict() or {}
                 # Check all possible takeover flags
                 is_takeover = data.get("isHumanTakeover", False) or data.get("humanTakeover", False)
                 ai_paused = data.get("aiPaused", False)
@@ -1158,11 +1618,11 @@ class GendeiDatabase:
             True if successful
         """
         try:
-            conv_ref = self.db.collection(CLINICS).document(clinic_id).collection(
+            conv_ref = self._clinics.document(clinic_id).collection(
                 "conversations"
             ).document(phone)
 
-            now = datetime.now().isoformat()
+            now = firestore.SERVER_TIMESTAMP
             updates = {
                 "humanTakeover": enabled,
                 "isHumanTakeover": enabled,  # Dashboard uses this field
@@ -1177,7 +1637,7 @@ class GendeiDatabase:
                 if reason:
                     updates["humanTakeoverReason"] = reason
 
-            conv_ref.set(updates, merge=True)
+            conv_ref.set(updates, merge=True, timeout=WRITE_TIMEOUT_SECONDS)
 
             logger.info(f"{'🙋' if enabled else '🤖'} Human takeover {'enabled' if enabled else 'disabled'} for {phone}")
             return True
@@ -1200,14 +1660,14 @@ class GendeiDatabase:
             Conversation state dict
         """
         try:
-            conv_ref = self.db.collection(CLINICS).document(clinic_id).collection(
+            conv_ref = self._clinics.document(clinic_id).collection(
                 "conversations"
             ).document(phone)
-            doc = conv_ref.get()
+            doc = conv_ref.get(**READ_OPTIONS)
 
             if doc.exists:
                 state = doc.to_dict()
-                logger.debug(f"📋 Loaded conversation state for {phone}")
+                logger.debug("📋 Loaded conversation state for %s", phone)
                 return state
             else:
                 # Create new conversation state
@@ -1227,7 +1687,12 @@ class GendeiDatabase:
                     "createdAt": now,
                     "updatedAt": now
                 }
-                conv_ref.set(new_state)
+                conv_ref.set({
+                    **new_state,
+                    "lastMessageAt": firestore.SERVER_TIMESTAMP,
+                    "createdAt": firestore.SERVER_TIMESTAMP,
+                    "updatedAt": firestore.SERVER_TIMESTAMP,
+                }, timeout=WRITE_TIMEOUT_SECONDS)
                 logger.info(f"📋 Created new conversation state for {phone}")
                 return new_state
 
@@ -1257,19 +1722,23 @@ class GendeiDatabase:
             True if successful
         """
         try:
-            conv_ref = self.db.collection(CLINICS).document(clinic_id).collection(
+            conv_ref = self._clinics.document(clinic_id).collection(
                 "conversations"
             ).document(phone)
 
-            # Update timestamps
+            # Update timestamps (the caller's copy keeps a local ISO value)
             now = datetime.now().isoformat()
             state["updatedAt"] = now
             state["lastMessageAt"] = now
 
-            # Merge with existing data
-            conv_ref.set(state, merge=True)
+            # Merge with existing data; Firestore stamps the stored times
+            conv_ref.set({
+                **state,
+                "updatedAt": firestore.SERVER_TIMESTAMP,
+                "lastMessageAt": firestore.SERVER_TIMESTAMP,
+            }, merge=True, timeout=WRITE_TIMEOUT_SECONDS)
 
-            logger.debug(f"💾 Saved conversation state for {phone}")
+            logger.debug("💾 Saved conversation state for %s", phone)
             return True
 
         except Exception as e:
@@ -1286,11 +1755,11 @@ class GendeiDatabase:
             Conversation state dict or None if not found
         """
         try:
-            conv_ref = self.db.collection(CLINICS).document(clinic_id).collection(
+            conv_ref = self._clinics.document(clinic_id).collection(
                 "conversations"
             ).document(phone)
 
-            doc = conv_ref.get()
+            doc = conv_ref.get(**READ_OPTIONS)
             if doc.exists:
                 return doc.to_dict()
             return None
@@ -1313,19 +1782,18 @@ class GendeiDatabase:
             True if message was already processed
         """
         try:
-            doc_ref = self.db.collection("gendei_processed_messages").document(message_id)
-            doc = doc_ref.get()
+            doc_ref = self._processed_messages.document(message_id)
+            doc = doc_ref.get(**READ_OPTIONS)
 
             if doc.exists:
                 # Check if within TTL
                 data = doc.to_dict()
-                processed_at = data.get("processedAt", "")
-                if processed_at:
-                    processed_time = datetime.fromisoformat(processed_at)
-                    if datetime.now() - processed_time < timedelta(hours=ttl_hours):
+                processed_age = self._timestamp_age(data.get("processedAt"))
+                if processed_age is not None:
+                    if processed_age < timedelta(hours=ttl_hours):
                         return True
                     # Expired, will be re-processed
-                    doc_ref.delete()
+                    doc_ref.delete(timeout=WRITE_TIMEOUT_SECONDS)
                     return False
                 return True
 
@@ -1344,15 +1812,65 @@ class GendeiDatabase:
             True if successful
         """
         try:
-            self.db.collection("gendei_processed_messages").document(message_id).set({
+            self._processed_messages.document(message_id).set({
                 "messageId": message_id,
-                "processedAt": datetime.now().isoformat()
-            })
+                "processedAt": firestore.SERVER_TIMESTAMP
+            }, timeout=WRITE_TIMEOUT_SECONDS)
             return True
         except Exception as e:
             logger.error(f"Error marking message processed: {e}")
             return False
 
+    def _seen_recently(self, message_id: str, ttl_hours: int) -> bool:
+        """True if this process claimed or saw the message within the TTL."""
+        with self._seen_messages_lock:
+            seen_at = self._seen_messages.get(message_id)
+            if seen_at is None:
+                return False
+            if time.monotonic() - seen_at >= ttl_hours * 3600:
+                del self._seen_messages[message_id]
+                return False
+            self._seen_messages.move_to_end(message_id)
+            return True
+
+    def _remember_message(self, message_id: str) -> None:
+        with self._seen_messages_lock:
+            self._seen_messages[message_id] = time.monotonic()
+            self._seen_messages.move_to_end(message_id)
+            while len(self._seen_messages) > SEEN_MESSAGES_MAX_ENTRIES:
+                self._seen_messages.popitem(last=False)
+
+    def claim_message(self, message_id: str, ttl_hours: int = 24) -> bool:
+        """
+        Atomically check and mark a message as processed in one write.
+        Args:
+            message_id: WhatsApp message ID
+            ttl_hours: Hours to keep message IDs
+        Returns:
+            True if this caller claimed the message (not processed before)
+        """
+        if self._seen_recently(message_id, ttl_hours):
+            return False
+        doc_ref = self._processed_messages.document(message_id)
+        record = {
+            "messageId": message_id,
+            "processedAt": firestore.SERVER_TIMESTAMP
+        }
+        try:
+            doc_ref.create(record, timeout=WRITE_TIMEOUT_SECONDS)
+            self._remember_message(message_id)
+            return True
+        except AlreadyExists:
+            # Already claimed; re-claim only if the earlier record expired
+            if self.is_message_processed(message_id, ttl_hours):
+                self._remember_message(message_id)
+                return False
+            self._remember_message(message_id)
+            return self.mark_message_processed(message_id)
+        except Exception as e:
+            logger.error(f"Error claiming message: {e}")
+            return True
+
     # ============================================
     # APPOINTMENTS NEEDING REMINDERS
     # ============================================
@@ -1360,13 +1878,15 @@ class GendeiDatabase:
     def get_appointments_needing_reminder(
         self,
         reminder_type: str,
-        clinic_id: Optional[str] = None
+        clinic_id: Optional[str] = None,
+        fields: Optional[List[str]] = None
     ) -> List[Appointment]:
         """
         Get appointments that need a specific reminder sent.
         Args:
             reminder_type: "reminder_24h" or "reminder_2h"
             clinic_id: Optional filter by clinic
+            fields: Optional field mask (must include date, time, status and reminder flags)
         Returns:
             List of appointments needing reminders
         """
@@ -1389,16 +1909,16 @@ class GendeiDatabase:
             start_date = window_start.date().isoformat()
             end_date = window_end.date().isoformat()
 
-            query = self.db.collection(APPOINTMENTS).where("date", ">=", start_date).where("date", "<=", end_date)
+            query = self._appointments.where("date", ">=", start_date).where("date", "<=", end_date)
 
             if clinic_id:
                 query = query.where("clinicId", "==", clinic_id)
-
-            docs = query.get()
+            if fields:
+                query = query.select(self._mask_with(fields, "date"))
 
             # Filter to confirmed appointments that haven't received this reminder
             needs_reminder = []
-            for doc in docs:
+            for doc in self._paginate(query.order_by("date")):
                 data = doc.to_dict()
                 data["id"] = doc.id
 
@@ -348,8 +348,11 @@ class FlowsHandler:
                 }
             }
 
-        # Get professional info
-        professional = self.db.get_professional(clinic_id, professional_id) if self.db else None
+        # Get professional info (batched with the clinic doc)
+        clinic, professionals = (
+            self.db.get_clinic_bundle(clinic_id, [professional_id]) if self.db else (None, {})
+        )
+        professional = professionals.get(professional_id)
         if not professional:
             return {
                 "screen": "ESPECIALIDADE",
@@ -359,8 +362,7 @@ class FlowsHandler:
                 }
             }
 
-        # Get clinic + vertical config
-        clinic = self.db.get_clinic(clinic_id) if self.db else None
+        # Vertical config for the clinic
         vertical_slug = getattr(clinic, 'vertical', '') if clinic else ''
         vc = get_vertical_config(vertical_slug)
 
@@ -51,7 +51,9 @@ try:
     )
     from src.scheduler.reminders import (
         format_reminder_message,
-        mark_reminder_sent,
+        reminder_sent_fields,
+        REMINDER_APPOINTMENT_FIELDS,
+        REMINDER_MARK_PAGE_SIZE,
     )
     from src.flows.handler import FlowsHandler
     from src.flows.orchestrator import (
@@ -63,7 +65,14 @@ try:
     from src.vertical_config import get_vertical_config, get_specialty_name, ALL_SPECIALTIES
     from src.flows.manager import send_whatsapp_flow, send_booking_flow, generate_flow_token
     from src.flows.crypto import handle_encrypted_flow_request, prepare_flow_response, is_encryption_configured
-    from src.agents.orchestrator import get_orchestrator
+    from src.agents.orchestrator import (
+        get_orchestrator,
+        get_orchestrator_cache_stats,
+        invalidate_clinic_context,
+        get_clinic_context_cache_stats,
+        get_routing_cache_stats,
+    )
+    from src.agents.prompts import PROMPT_VERSIONS
     from src.runtime.context import Runtime, set_runtime, reset_runtime
     from src.payments.pricing import resolve_consultation_pricing
     from src.providers.tools.base import register_tool_implementations
@@ -1282,6 +1291,8 @@ async def lifespan(app: FastAPI):
     global db, flows_handler
     logger.info("🚀 Starting Gendei WhatsApp Agent...")
     db = GendeiDatabase()
+    # Clinic/professional/service writes drop the agents' cached clinic context
+    db.add_clinic_change_listener(invalidate_clinic_context)
     flows_handler = FlowsHandler(db)
     register_tool_implementations()
     logger.info("✅ Database initialized")
@@ -1346,13 +1357,8 @@ def is_message_processed(message_id: str) -> bool:
     if not db:
         return False
 
-    # Check Firestore
-    if db.is_message_processed(message_id):
-        return True
-
-    # Mark as processed
-    db.mark_message_processed(message_id)
-    return False
+    # Check and mark in one Firestore write
+    return not db.claim_message(message_id)
 
 
 async def send_whatsapp_message(
@@ -3038,7 +3044,13 @@ async def health():
     return {
         "status": "healthy",
         "service": "Gendei WhatsApp Agent",
-        "timestamp": datetime.now().isoformat()
+        "timestamp": datetime.now().isoformat(),
+        "caches": {
+            "orchestrators": get_orchestrator_cache_stats(),
+            "clinic_context": get_clinic_context_cache_stats(),
+            "routing": get_routing_cache_stats(),
+        },
+        "prompt_versions": dict(PROMPT_VERSIONS),
     }
 
 
@@ -3219,12 +3231,20 @@ async def process_reminders(request: Request):
 
         # Process 24h reminders
         for reminder_type in ["reminder_24h", "reminder_2h"]:
-            appointments = db.get_appointments_needing_reminder(reminder_type, clinic_id)
+            appointments = db.get_appointments_needing_reminder(
+                reminder_type, clinic_id, fields=REMINDER_APPOINTMENT_FIELDS
+            )
+            sent_updates = []
+            clinics = db.get_clinics([apt.clinic_id for apt in appointments if apt.clinic_id])
 
             for apt in appointments:
                 try:
+                    if not apt.clinic_id:
+                        logger.warning(f"Appointment {apt.id} has no clinicId, skipping reminder")
+                        continue
+
                     # Get clinic info
-                    clinic = db.get_clinic(apt.clinic_id)
+                    clinic = clinics.get(apt.clinic_id)
                     if not clinic:
                         continue
 
@@ -3265,9 +3285,12 @@ async def process_reminders(request: Request):
                         )
 
                     if success:
-                        # Mark reminder as sent
-                        mark_reminder_sent(db, apt.id, reminder_type)
+                        # Mark reminder as sent (committed a page at a time)
+                        sent_updates.append((apt.id, reminder_sent_fields(reminder_type)))
                         results[reminder_type]["sent"] += 1
+                        if len(sent_updates) >= REMINDER_MARK_PAGE_SIZE:
+                            db.update_reminder_appointments(sent_updates)
+                            sent_updates = []
                         logger.info(f"✅ Sent {reminder_type} reminder for appointment {apt.id}")
                     else:
                         results[reminder_type]["failed"] += 1
@@ -3277,6 +3300,9 @@ async def process_reminders(request: Request):
                     results[reminder_type]["failed"] += 1
                     logger.error(f"❌ Error processing reminder for {apt.id}: {e}")
 
+            if sent_updates:
+                db.update_reminder_appointments(sent_updates)
+
         logger.info(f"📊 Reminder processing complete: {results}")
         return {"success": True, "results": results}
 
@@ -3450,7 +3476,7 @@ async def pix_payment_page(phone: str, order_id: str):
         if not order:
             # Try to find by searching recent orders
             from google.cloud import firestore as gcloud_firestore
-            firestore_client = gcloud_firestore.Client()
+            firestore_client = db.db if db else gcloud_firestore.Client()
             orders_ref = firestore_client.collection("gendei_orders")
 
             # Search by order ID prefix
@@ -50,6 +50,7 @@ class AgentDefinition:
     model_config: ModelConfig
     tools: List[str]  # List of tool names
     handoffs: List[AgentType] = field(default_factory=list)  # Agents this agent can hand off to
+    prompt_key: Optional[str] = None  # Key in AGENT_PROMPTS, rendered via format_prompt
 
 
 @dataclass
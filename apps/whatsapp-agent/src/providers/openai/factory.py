@@ -7,6 +7,7 @@ instead of the ToolConverter, and attaches SDK guardrails to agents.
 
 from typing import Dict, List, Any, Optional
 import logging
+import os
 
 from agents import Agent, ModelSettings  # type: ignore
 
@@ -19,6 +20,10 @@ from .session import OpenAISessionManager
 
 logger = logging.getLogger(__name__)
 
+# Optional extended prompt-cache retention (e.g. "24h") for models that
+# support it; unset keeps OpenAI's default in-memory retention.
+PROMPT_CACHE_RETENTION = os.getenv("OPENAI_PROMPT_CACHE_RETENTION", "").strip()
+
 
 class OpenAIAgent(BaseAgent):
     """OpenAI-specific agent wrapper."""
@@ -58,9 +63,14 @@ class OpenAIAgentFactory(BaseAgentFactory):
         sdk_tools = get_tools_for_agent(definition.name)
 
         # Create model settings
+        extra_args: Dict[str, Any] = {"prompt_cache_key": self._prompt_cache_key(definition, context)}
+        if PROMPT_CACHE_RETENTION:
+            extra_args["prompt_cache_retention"] = PROMPT_CACHE_RETENTION
+
         model_settings = ModelSettings(
             max_tokens=definition.model_config.max_tokens,
             temperature=definition.model_config.temperature,
+            extra_args=extra_args,
         )
 
         if definition.model_config.tool_choice == "required":
@@ -84,7 +94,10 @@ class OpenAIAgentFactory(BaseAgentFactory):
             output_guardrails=[output_sanitizer],
         )
 
-        logger.debug(f"Created OpenAI agent: {definition.name} with {len(sdk_tools)} tools, guardrails attached")
+        logger.debug(
+            f"Created OpenAI agent: {definition.name} with {len(sdk_tools)} tools, guardrails attached "
+            f"(prompt_cache_key={extra_args['prompt_cache_key']})"
+        )
 
         return OpenAIAgent(
             definition=definition,
@@ -133,44 +146,67 @@ class OpenAIAgentFactory(BaseAgentFactory):
                 agent.set_handoffs(handoff_agents)
                 logger.debug(f"Set {len(handoff_agents)} handoffs for {definition.name}")
 
+    def _prompt_cache_key(
+        self,
+        definition: AgentDefinition,
+        context: Dict[str, Any]
+    ) -> str:
+        """
+        Cache routing key for OpenAI's automatic prompt caching.
+
+        Keyed per (agent, clinic): concurrent conversations of one clinic
+        share the whole system prompt and tool list, so pinning them to the
+        same cache reuses the prefill across all of them. Contexts without a
+        clinic id fall back to the vertical, whose prefix is shared too.
+        The prompt version moves traffic to a fresh key when a prompt changes.
+        """
+        from src.agents.prompts import PROMPT_VERSIONS
+
+        scope = context.get("clinic_id") or (context.get("vertical") or {}).get("slug", "geral")
+        version = PROMPT_VERSIONS.get(definition.prompt_key or "", "")
+        return f"gendei:{definition.name}:{scope}:{version}"
+
     def _build_prompt(
         self,
         definition: AgentDefinition,
         context: Dict[str, Any]
     ) -> str:
         """Build system prompt with context injection."""
-        prompt = definition.system_prompt
+        values: Dict[str, str] = {}
 
         # Inject clinic context (Gendei)
         if "clinic" in context:
             clinic = context["clinic"]
-            prompt = prompt.replace("{clinic_name}", str(clinic.get("name", "Clínica")))
-            prompt = prompt.replace("{clinic_context}", self._format_clinic_context(clinic))
+            values["clinic_name"] = str(clinic.get("name", "Clínica"))
+            values["clinic_context"] = self._format_clinic_context(clinic)
 
         # Inject vertical terminology
         if "vertical" in context:
             v = context["vertical"]
             appointment_term = v.get("appointment_term", "consulta")
             appointment_plural = v.get("appointment_plural", "consultas")
-            prompt = prompt.replace("{appointment_term}", appointment_term)
-            prompt = prompt.replace("{appointment_plural}", appointment_plural)
-            prompt = prompt.replace("{appointment_term_upper}", appointment_term.upper())
-            prompt = prompt.replace("{appointment_plural_upper}", appointment_plural.upper())
-            prompt = prompt.replace("{client_term}", v.get("client_term", "paciente"))
-            prompt = prompt.replace("{professional_term}", v.get("professional_term", "médico(a)"))
-            prompt = prompt.replace("{professional_emoji}", v.get("professional_emoji", ""))
-            prompt = prompt.replace("{convenio_instruction}", v.get("convenio_instruction", ""))
-            prompt = prompt.replace("{no_emoji_reason}", "ambiente profissional")
-
-        # Inject professionals context
-        if "professionals" in context:
-            prof_str = self._format_professionals(context["professionals"])
-            prompt = prompt.replace("{professionals}", prof_str)
-
-        # Inject services context
-        if "services" in context:
-            services_str = self._format_services(context["services"])
-            prompt = prompt.replace("{services}", services_str)
+            values["appointment_term"] = appointment_term
+            values["appointment_plural"] = appointment_plural
+            # Precomputed by the vertical loader; derive only for ad-hoc contexts
+            values["appointment_term_upper"] = v.get("appointment_term_upper") or appointment_term.upper()
+            values["appointment_plural_upper"] = v.get("appointment_plural_upper") or appointment_plural.upper()
+            values["client_term"] = v.get("client_term", "paciente")
+            values["professional_term"] = v.get("professional_term", "médico(a)")
+            values["professional_emoji"] = v.get("professional_emoji", "")
+            values["convenio_instruction"] = v.get("convenio_instruction", "")
+            values["no_emoji_reason"] = "ambiente profissional"
+
+        # Professionals and services are not rendered into the prompt: agents
+        # fetch the catalog on demand with get_professionals()/get_services().
+
+        if definition.prompt_key:
+            # Memoized: identical contexts across agent rebuilds skip formatting
+            from src.agents.prompts import format_prompt
+            prompt = format_prompt(definition.prompt_key, **values)
+        else:
+            prompt = definition.system_prompt
+            for key, value in values.items():
+                prompt = prompt.replace(f"{{{key}}}", value)
 
         # If clinic has FAQ items without answers, guide agent behavior explicitly.
         clinic_ctx = context.get("clinic", {})
@@ -250,43 +286,6 @@ class OpenAIAgentFactory(BaseAgentFactory):
 
         return "\n".join(lines) if lines else "Informações não disponíveis."
 
-    def _format_professionals(self, professionals: List[Dict]) -> str:
-        """Format professionals for prompt injection."""
-        if not professionals:
-            return "Nenhum profissional cadastrado."
-
-        lines = []
-        for p in professionals:
-            name = p.get('full_name') or p.get('name', 'Profissional')
-            specialty = p.get('specialty', '')
-            line = f"- {name}"
-            if specialty:
-                line += f" ({specialty})"
-            lines.append(line)
-        return "\n".join(lines)
-
-    def _format_services(self, services: List[Dict]) -> str:
-        """Format services for prompt injection."""
-        if not services:
-            return "Nenhum serviço cadastrado."
-
-        lines = []
-        for s in services:
-            name = getattr(s, "name", None) or s.get('name', 'Serviço')
-            duration = getattr(s, "duration_minutes", None)
-            if duration is None:
-                duration = s.get('duration', 30)
-            price_cents = getattr(s, "price_cents", None)
-            if price_cents is None:
-                price = s.get('price', 0)
-            else:
-                price = price_cents / 100
-            line = f"- {name} ({duration} min)"
-            if price and price > 0:
-                line += f" - R$ {price:.2f}".replace('.', ',')
-            lines.append(line)
-        return "\n".join(lines)
-
     def get_runner(self) -> BaseRunner:
         """Get the OpenAI runner."""
         if self._runner is None:
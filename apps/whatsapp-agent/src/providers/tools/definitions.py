@@ -29,7 +29,7 @@ TOOL_DEFINITIONS: Dict[str, Dict[str, Any]] = {
 
     "get_clinic_info": {
         "name": "get_clinic_info",
-        "description": "Get information about the clinic including address, opening hours, phone, and payment options.",
+        "description": "Get information about the clinic including address, opening hours, phone, payment options, description and FAQ.",
         "parameters": [],
     },
 
@@ -261,6 +261,7 @@ AGENT_TOOL_GROUPS: Dict[str, List[str]] = {
         "get_available_slots",
         "create_appointment",
         "send_appointment_confirmation",
+        "get_clinic_info",
     ],
 
     # Appointment Manager - view/cancel/reschedule
@@ -269,12 +270,14 @@ AGENT_TOOL_GROUPS: Dict[str, List[str]] = {
         "get_patient_appointments",
         "cancel_appointment",
         "reschedule_appointment",
+        "get_clinic_info",
     ],
 
     # Support - human escalation
     "support_agent": [
         "send_text_message",
         "enable_human_takeover",
+        "get_clinic_info",
     ],
 
     # Triage - routes to other agents
@@ -14,6 +14,8 @@ from .models import (
 from .availability import (
     get_available_slots,
     get_professional_availability,
+    check_slot_availability,
+    is_slot_available,
     book_time_slot,
     format_slots_for_display
 )
@@ -26,9 +28,12 @@ from .appointments import (
 )
 from .reminders import (
     mark_reminder_sent,
+    reminder_sent_fields,
     format_reminder_message,
     REMINDER_24H,
-    REMINDER_2H
+    REMINDER_2H,
+    REMINDER_APPOINTMENT_FIELDS,
+    REMINDER_MARK_PAGE_SIZE
 )
 
 __all__ = [
@@ -44,6 +49,8 @@ __all__ = [
     # Availability
     'get_available_slots',
     'get_professional_availability',
+    'check_slot_availability',
+    'is_slot_available',
     'book_time_slot',
     'format_slots_for_display',
     # Appointments
@@ -54,7 +61,10 @@ __all__ = [
     'reschedule_appointment',
     # Reminders
     'mark_reminder_sent',
+    'reminder_sent_fields',
     'format_reminder_message',
     'REMINDER_24H',
-    'REMINDER_2H'
+    'REMINDER_2H',
+    'REMINDER_APPOINTMENT_FIELDS',
+    'REMINDER_MARK_PAGE_SIZE'
 ]
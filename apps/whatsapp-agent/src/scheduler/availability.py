@@ -152,15 +152,7 @@ def get_available_slots(
             start_date=start.isoformat(),
             end_date=end.isoformat()
         )
-        # Release expired unpaid payment holds so slots can be reused.
-        release_expired_unpaid_holds(db, existing_appointments)
-        booked_slots = set()
-        for apt in existing_appointments:
-            if is_unpaid_hold_expired(apt):
-                continue
-            if apt.status.value not in ["cancelled", "no_show"]:
-                slot_key = f"{apt.date}_{apt.time}_{apt.professional_id}"
-                booked_slots.add(slot_key)
+        booked_slots = _booked_slot_keys(db, existing_appointments)
 
         # Generate available slots
         available_slots = []
@@ -171,27 +163,14 @@ def get_available_slots(
             date_str = current_date.isoformat()
 
             for professional in professionals:
-                # Get working hours for this day
-                working_hours = _coerce_periods_for_day(
-                    getattr(professional, "working_hours", {}) or {},
-                    day_of_week
-                )
-
-                for period in working_hours:
-                    start_time = period.get("start", "09:00")
-                    end_time = period.get("end", "18:00")
-
-                    # Generate slots for this period
-                    slots = _generate_slots_for_period(
-                        date_str=date_str,
-                        start_time=start_time,
-                        end_time=end_time,
-                        professional=professional,
-                        clinic_id=clinic_id,
-                        service_id=service_id,
-                        booked_slots=booked_slots
-                    )
-                    available_slots.extend(slots)
+                available_slots.extend(_generate_slots_for_day(
+                    date_str=date_str,
+                    day_of_week=day_of_week,
+                    professional=professional,
+                    clinic_id=clinic_id,
+                    service_id=service_id,
+                    booked_slots=booked_slots
+                ))
 
             current_date += timedelta(days=1)
 
@@ -206,6 +185,48 @@ def get_available_slots(
         return []
 
 
+def _booked_slot_keys(db, appointments: List[Any]) -> set:
+    """Slot keys taken by appointments, after releasing expired unpaid holds."""
+    # Release expired unpaid payment holds so slots can be reused.
+    release_expired_unpaid_holds(db, appointments)
+    booked_slots = set()
+    for apt in appointments:
+        if is_unpaid_hold_expired(apt):
+            continue
+        if apt.status.value not in ["cancelled", "no_show"]:
+            slot_key = f"{apt.date}_{apt.time}_{apt.professional_id}"
+            booked_slots.add(slot_key)
+    return booked_slots
+
+
+def _generate_slots_for_day(
+    date_str: str,
+    day_of_week: int,
+    professional: Professional,
+    clinic_id: str,
+    service_id: Optional[str],
+    booked_slots: set
+) -> List[TimeSlot]:
+    """Generate a professional's free slots across the working periods of one day"""
+    slots = []
+    # Get working hours for this day
+    working_hours = _coerce_periods_for_day(
+        getattr(professional, "working_hours", {}) or {},
+        day_of_week
+    )
+    for period in working_hours:
+        slots.extend(_generate_slots_for_period(
+            date_str=date_str,
+            start_time=period.get("start", "09:00"),
+            end_time=period.get("end", "18:00"),
+            professional=professional,
+            clinic_id=clinic_id,
+            service_id=service_id,
+            booked_slots=booked_slots
+        ))
+    return slots
+
+
 def _generate_slots_for_period(
     date_str: str,
     start_time: str,
@@ -302,6 +323,70 @@ def get_professional_availability(
     return [slot.time for slot in slots]
 
 
+def check_slot_availability(
+    db,
+    clinic_id: str,
+    professional_id: str,
+    date_str: str,
+    time_str: str
+) -> Tuple[bool, Optional[Professional]]:
+    """
+    Check whether a single time is still bookable for a professional.
+
+    Builds the professional's slots for the day with the same generator as
+    get_available_slots, but only queries the appointments that occupy that
+    exact slot instead of the whole date range.
+
+    Returns:
+        (available, professional) - the professional doc read for the check,
+        or None when it was resolved by name or not found, so callers
+        booking the slot don't need to read it again
+    """
+    try:
+        professional = db.get_professional(clinic_id, professional_id, active_only=True)
+        if not professional:
+            # Agent may pass a name instead of an ID; use the tolerant full listing
+            # (which also leaves out inactive professionals)
+            return time_str in get_professional_availability(
+                db, clinic_id, professional_id, date_str
+            ), None
+
+        day_of_week = datetime.strptime(date_str, "%Y-%m-%d").weekday()
+        day_slots = _generate_slots_for_day(
+            date_str=date_str,
+            day_of_week=day_of_week,
+            professional=professional,
+            clinic_id=clinic_id,
+            service_id=None,
+            booked_slots=set()
+        )
+        # Off-grid times are rejected without touching the database
+        if not any(slot.time == time_str for slot in day_slots):
+            return False, professional
+
+        existing = db.get_appointments_at_slot(
+            clinic_id, professional.id, date_str, time_str
+        )
+        booked_slots = _booked_slot_keys(db, existing)
+        return f"{date_str}_{time_str}_{professional.id}" not in booked_slots, professional
+
+    except Exception as e:
+        logger.error(f"Error checking slot availability: {e}")
+        return False, None
+
+
+def is_slot_available(
+    db,
+    clinic_id: str,
+    professional_id: str,
+    date_str: str,
+    time_str: str
+) -> bool:
+    """Check whether a single time is still bookable for a professional."""
+    available, _ = check_slot_availability(db, clinic_id, professional_id, date_str, time_str)
+    return available
+
+
 def book_time_slot(
     db,
     clinic_id: str,
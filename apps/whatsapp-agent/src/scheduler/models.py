@@ -54,7 +54,7 @@ def _parse_datetime(value: Any) -> Optional[datetime]:
     return None
 
 
-@dataclass
+@dataclass(slots=True)
 class Clinic:
     """Clinic data model"""
     id: str
@@ -173,7 +173,7 @@ class Clinic:
         )
 
 
-@dataclass
+@dataclass(slots=True)
 class Professional:
     """Professional/Doctor data model"""
     id: str
@@ -264,7 +264,7 @@ class Professional:
         return self.specialty or ""
 
 
-@dataclass
+@dataclass(slots=True)
 class Service:
     """Service/Procedure data model"""
     id: str
@@ -330,7 +330,7 @@ class Service:
         return self.price_cents / 100
 
 
-@dataclass
+@dataclass(slots=True)
 class TimeSlot:
     """Available time slot"""
     date: str                       # YYYY-MM-DD
@@ -365,7 +365,7 @@ class TimeSlot:
         return f"{self.date}_{self.time.replace(':', '')}_{self.professional_id}"
 
 
-@dataclass
+@dataclass(slots=True)
 class Patient:
     """Patient data model"""
     id: str                         # Usually phone number
@@ -415,7 +415,7 @@ class Patient:
         )
 
 
-@dataclass
+@dataclass(slots=True)
 class Appointment:
     """Appointment data model"""
     id: str
@@ -11,6 +11,44 @@ logger = logging.getLogger(__name__)
 REMINDER_24H = "reminder_24h"
 REMINDER_2H = "reminder_2h"
 
+# Appointment fields the reminder sweep reads (field mask for the window query)
+REMINDER_APPOINTMENT_FIELDS = [
+    "clinicId",
+    "patientId",
+    "patientName",
+    "patientPhone",
+    "professionalName",
+    "date",
+    "time",
+    "status",
+    "reminder24hSent",
+    "reminder2hSent",
+]
+
+# The sweep commits its sent-markers every this many reminders, so a failed
+# or interrupted run re-sends at most one page
+REMINDER_MARK_PAGE_SIZE = 20
+
+
+def reminder_sent_fields(reminder_type: str) -> dict:
+    """
+    Appointment fields recording that a reminder was sent.
+
+    Returns:
+        Update dict, or an empty dict for an unknown reminder type
+    """
+    if reminder_type == REMINDER_24H:
+        return {
+            "reminder24hSent": True,
+            "reminder24hAt": datetime.now().isoformat()
+        }
+    if reminder_type == REMINDER_2H:
+        return {
+            "reminder2hSent": True,
+            "reminder2hAt": datetime.now().isoformat()
+        }
+    return {}
+
 
 def mark_reminder_sent(
     db,
@@ -24,17 +62,8 @@ def mark_reminder_sent(
         True if successful
     """
     try:
-        if reminder_type == REMINDER_24H:
-            update_data = {
-                "reminder24hSent": True,
-                "reminder24hAt": datetime.now().isoformat()
-            }
-        elif reminder_type == REMINDER_2H:
-            update_data = {
-                "reminder2hSent": True,
-                "reminder2hAt": datetime.now().isoformat()
-            }
-        else:
+        update_data = reminder_sent_fields(reminder_type)
+        if not update_data:
             logger.error(f"Unknown reminder type: {reminder_type}")
             return False
 
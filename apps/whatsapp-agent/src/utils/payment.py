@@ -684,9 +684,7 @@ async def process_payment_confirmation(
 
         # If not found with direct IDs, try searching by payment_id field
         if not order:
-            from google.cloud import firestore as gcloud_firestore
-            firestore_client = gcloud_firestore.Client()
-            orders_ref = firestore_client.collection("gendei_orders")
+            orders_ref = db.db.collection("gendei_orders")
 
             # Search by paymentId field
             docs = orders_ref.where("paymentId", "==", transaction_id).limit(1).get()
@@ -703,8 +701,7 @@ async def process_payment_confirmation(
                 logger.info(f"🔍 Searching for order with prefix: {order_id_prefix}")
 
                 from google.cloud import firestore as gcloud_firestore
-                firestore_client = gcloud_firestore.Client()
-                orders_ref = firestore_client.collection("gendei_orders")
+                orders_ref = db.db.collection("gendei_orders")
 
                 # Get recent orders and find one matching the prefix
                 for order_doc in orders_ref.order_by("createdAt", direction=gcloud_firestore.Query.DESCENDING).limit(50).stream():
@@ -7,6 +7,7 @@ which determines how the bot communicates and what features it offers.
 """
 
 from dataclasses import dataclass, field
+from functools import lru_cache
 from typing import Dict, List, Optional
 
 
@@ -22,6 +23,13 @@ class VerticalTerminology:
     service_emoji: str              # emoji for services list
     greeting_context: str           # "saúde", "saúde bucal", "bem-estar", "nutrição"
     no_show_emoji: str              # for confirmation messages
+    # Derived once at load for prompt headings ("CONSULTA", "SESSÕES")
+    appointment_term_upper: str = field(init=False, repr=False)
+    appointment_term_plural_upper: str = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self.appointment_term_upper = self.appointment_term.upper()
+        self.appointment_term_plural_upper = self.appointment_term_plural.upper()
 
 
 @dataclass
@@ -294,7 +302,8 @@ def get_vertical_config(vertical_slug: Optional[str]) -> VerticalConfig:
     return VERTICALS.get(vertical_slug, DEFAULT_VERTICAL)
 
 
+@lru_cache(maxsize=512)
 def get_specialty_name(vertical_slug: Optional[str], specialty_id: str) -> str:
-    """Get display name for a specialty within a vertical."""
+    """Get display name for a specialty within a vertical (memoized; mappings are static)."""
     config = get_vertical_config(vertical_slug)
     return config.specialties.get(specialty_id, ALL_SPECIALTIES.get(specialty_id, specialty_id))
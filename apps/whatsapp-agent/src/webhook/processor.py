@@ -45,13 +45,12 @@ async def process_webhook_body(
             if not phone_number_id:
                 continue
 
-            clinic = deps.db.get_clinic_by_phone_number_id(phone_number_id) if deps.db else None
+            clinic, access_token = deps.db.resolve_webhook_context(phone_number_id) if deps.db else (None, None)
             if not clinic:
                 logger.warning(f"No clinic found for phone_number_id: {phone_number_id}")
                 continue
 
             clinic_id = clinic.id
-            access_token = deps.db.get_clinic_access_token(clinic_id) if deps.db else deps.whatsapp_token
             if not access_token:
                 access_token = deps.whatsapp_token
 